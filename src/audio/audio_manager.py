@@ -12,6 +12,7 @@ import os
 import sys
 import time
 import queue
+import socket
 import subprocess
 import threading
 import tempfile
@@ -586,16 +587,52 @@ class AudioManager:
     
     # ========== LINE コマンド受信 ==========
     
+    AUDIO_CMD_SOCK = "/tmp/shipos_audio.sock"
     AUDIO_CMD_FILE = "/tmp/shipos_audio_cmd.json"
     
+    def _open_cmd_socket(self) -> Optional[socket.socket]:
+        """コマンド受信用の Unix DGRAM ソケットを開く（失敗したら None → ファイル監視のみ）"""
+        try:
+            if os.path.exists(self.AUDIO_CMD_SOCK):
+                os.unlink(self.AUDIO_CMD_SOCK)  # 前回の残骸
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(self.AUDIO_CMD_SOCK)
+            sock.settimeout(0.5)
+            return sock
+        except OSError as e:
+            logger.warning(f"[LINE CMD] ソケット作成失敗、ファイル監視のみで動作: {e}")
+            return None
+    
     def _line_cmd_worker(self):
-        """LINE音声コマンドポーリングワーカー"""
+        """
+        LINE音声コマンド受信ワーカー
+        
+        ソケットで受けたコマンドは即処理する。送信側が旧版・ソケット送信失敗時に
+        書くファイルも、受信待ちのタイムアウト（0.5秒）ごとに確認する。
+        """
         import json as _json
         last_timestamp = ""
-        logger.info(f"[LINE CMD] ワーカー開始: 監視ファイル={self.AUDIO_CMD_FILE}")
+        sock = self._open_cmd_socket()
+        logger.info(f"[LINE CMD] ワーカー開始: ソケット={self.AUDIO_CMD_SOCK if sock else 'なし'} "
+                    f"監視ファイル={self.AUDIO_CMD_FILE}")
         
         while self._running:
             try:
+                if sock is not None:
+                    try:
+                        data = sock.recv(65536)
+                    except socket.timeout:
+                        data = None
+                    if data:
+                        try:
+                            cmd = _json.loads(data)
+                        except ValueError:
+                            logger.error(f"[LINE CMD] 不正なコマンド: {data[:100]!r}")
+                        else:
+                            logger.info(f"[LINE CMD] コマンド受信: {cmd.get('action')}")
+                            self._handle_line_cmd(cmd)
+                        continue  # 続けて届いているコマンドをすぐ受ける
+                
                 if os.path.exists(self.AUDIO_CMD_FILE):
                     try:
                         with open(self.AUDIO_CMD_FILE, 'r', encoding='utf-8') as f:
@@ -618,8 +655,18 @@ class AudioManager:
                         logger.error(f"[LINE CMD] ファイル処理エラー: {e}")
             except Exception as e:
                 logger.error(f"[LINE CMD] 周期処理エラー: {e}")
+                time.sleep(0.5)
+                continue
             
-            time.sleep(0.5)  # 0.5秒間隔でポーリング
+            if sock is None:
+                time.sleep(0.5)  # 0.5秒間隔でポーリング（ソケット時は recv のタイムアウトが待ちになる）
+        
+        if sock is not None:
+            sock.close()
+            try:
+                os.unlink(self.AUDIO_CMD_SOCK)
+            except OSError:
+                pass
     
     def _handle_line_cmd(self, cmd: dict):
         """LINEコマンドを処理"""
@@ -66,6 +66,10 @@ class BillingGuard:
         # 使用量データの読み込み
         self.usage_data = self._load_usage()
         
+        # 使用量を更新するたびに増やす版数（get_summary のキャッシュ判定用）
+        self._version = 0
+        self._summary_cache: Tuple[Optional[tuple], str] = (None, "")
+        
         # 開始日の設定
         if start_date:
             self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
@@ -206,6 +210,7 @@ class BillingGuard:
         # 累計を更新
         self.usage_data["total_cost"] += cost
         self.usage_data["total_requests"] += 1
+        self._version += 1
         
         # 保存
         self._save_usage()
@@ -360,13 +365,19 @@ class BillingGuard:
         """
         使用量サマリーを取得
         
+        使用量・日付・経過日数が前回と同じなら前回の文字列を返す
+        
         Returns:
             サマリー文字列
         """
+        days_since_start = self.get_days_since_start()
+        cache_key = (self._version, datetime.now().strftime("%Y-%m-%d"), days_since_start)
+        if self._summary_cache[0] == cache_key:
+            return self._summary_cache[1]
+        
         today_cost = self.get_today_cost()
         thresholds = self.get_thresholds()
-        is_special = self.is_special_day()
-        days_since_start = self.get_days_since_start()
+        is_special = self.is_special_day(days_since_start)
         
         summary = "# 課金サマリー\n\n"
         summary += f"## 基本情報\n"
@@ -390,6 +401,7 @@ class BillingGuard:
         if alert:
             summary += f"\n⚠️ **{alert['message']}**: {alert['action']}\n"
         
+        self._summary_cache = (cache_key, summary)
         return summary
     
     def reset_daily_usage(self):
@@ -397,6 +409,7 @@ class BillingGuard:
         today = datetime.now().strftime("%Y-%m-%d")
         if today in self.usage_data["daily_usage"]:
             del self.usage_data["daily_usage"][today]
+        self._version += 1
         self._save_usage()
 
 
@@ -6,6 +6,10 @@ Discord通知モジュール
 """
 
 import os
+import time
+import queue
+import atexit
+import threading
 import requests
 from datetime import datetime
 from typing import Optional, Dict, List
@@ -14,6 +18,9 @@ from typing import Optional, Dict, List
 class DiscordNotifier:
     """Discord通知クラス"""
     
+    POST_MAX_RETRIES = 3   # 429（レート制限）時の再送回数
+    OUTBOX_MAX = 256       # 送信待ちの上限（Discordが長く落ちていても溜め込み過ぎない）
+    
     def __init__(self, webhook_url: Optional[str] = None):
         """
         初期化
@@ -25,6 +32,15 @@ class DiscordNotifier:
         
         if not self.webhook_url:
             raise ValueError("Discord Webhook URLが設定されていません")
+        
+        # keep-alive で TLS 接続を使い回す
+        self._session = requests.Session()
+        # 送信はバックグラウンドスレッドで行い、呼び出し側（メインループ）を待たせない
+        self._outbox: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=self.OUTBOX_MAX)
+        self._outbox_thread: Optional[threading.Thread] = None
+        self._outbox_lock = threading.Lock()
+        self._closed = False
+        atexit.register(self.close)
     
     def send_message(
         self,
@@ -33,7 +49,7 @@ class DiscordNotifier:
         embeds: Optional[List[Dict]] = None
     ) -> bool:
         """
-        Discordにメッセージを送信
+        Discordメッセージを送信キューに積む
         
         Args:
             content: メッセージ内容
@@ -41,28 +57,76 @@ class DiscordNotifier:
             embeds: 埋め込みメッセージのリスト
             
         Returns:
-            成功したらTrue
+            キューに積めたらTrue（キューが満杯、または close 済みならFalse）。
+            実際の送信結果は送信スレッド側でログに出る
         """
+        payload = {
+            "username": username,
+            "content": content
+        }
+        
+        if embeds:
+            payload["embeds"] = embeds
+        
+        if self._closed:
+            return False
+        self._ensure_outbox_worker()
         try:
-            payload = {
-                "username": username,
-                "content": content
-            }
-            
-            if embeds:
-                payload["embeds"] = embeds
-            
-            response = requests.post(
-                self.webhook_url,
-                json=payload,
-                timeout=10
-            )
-            
-            return response.status_code == 204
-            
-        except Exception as e:
-            print(f"Discord送信エラー: {e}")
+            self._outbox.put_nowait(payload)
+        except queue.Full:
+            print("Discord送信キューが満杯のため破棄しました")
             return False
+        return True
+    
+    def _ensure_outbox_worker(self):
+        """送信スレッドを必要時に起動"""
+        with self._outbox_lock:
+            if self._outbox_thread is None or not self._outbox_thread.is_alive():
+                self._outbox_thread = threading.Thread(
+                    target=self._outbox_worker, name="discord-outbox", daemon=True
+                )
+                self._outbox_thread.start()
+    
+    def _outbox_worker(self):
+        """キューから1件ずつ取り出して送信（None で終了）"""
+        while True:
+            payload = self._outbox.get()
+            if payload is None:
+                return
+            self._post(payload)
+    
+    def _post(self, payload: Dict) -> bool:
+        """Webhookに送信（429 は retry_after だけ待って送り直す）"""
+        for attempt in range(self.POST_MAX_RETRIES + 1):
+            try:
+                response = self._session.post(
+                    self.webhook_url,
+                    json=payload,
+                    timeout=10
+                )
+                if response.status_code == 429 and attempt < self.POST_MAX_RETRIES:
+                    try:
+                        delay = float(response.json().get("retry_after", 1.0))
+                    except Exception:
+                        delay = 1.0
+                    time.sleep(delay)
+                    continue
+                return response.status_code == 204
+                
+            except Exception as e:
+                print(f"Discord送信エラー: {e}")
+                return False
+        return False
+    
+    def close(self):
+        """送信キューを出し切って接続を閉じる（以降の send_message は False）"""
+        self._closed = True
+        thread = self._outbox_thread
+        if thread is not None and thread.is_alive():
+            self._outbox.put(None)
+            thread.join(timeout=30)
+        self._outbox_thread = None
+        self._session.close()
     
     def send_startup_notification(self) -> bool:
         """
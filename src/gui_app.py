@@ -88,12 +88,26 @@ def write_ship_mode(mode: str, reason: str = "GUI手動切替"):
         pass
 
 
+def _tail_lines(path: str, n: int, block: int = 8192) -> list:
+    """ファイル末尾から n 行だけ読む（改行付きの bytes のリスト、ファイル全体は読まない）"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    if pos > 0:
+        # 先頭は途中から読んだ行なので捨てる
+        buf = buf[buf.find(b"\n") + 1:]
+    return buf.splitlines(keepends=True)[-n:]
+
+
 def read_last_log_lines(path: str, n: int = 50) -> str:
     try:
         if os.path.exists(path):
-            with open(path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            return "".join(lines[-n:])
+            return b"".join(_tail_lines(path, n)).decode('utf-8', errors='replace')
     except Exception:
         pass
     return "(読み取り不可)"
@@ -103,21 +117,26 @@ def read_jsonl_tail(path: str, n: int = 20) -> list:
     entries = []
     try:
         if os.path.exists(path):
-            with open(path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        entries.append(json.loads(line.strip()))
-                    except Exception:
-                        continue
+            for line in _tail_lines(path, n):
+                try:
+                    entries.append(json.loads(line))
+                except Exception:
+                    continue
     except Exception:
         pass
-    return entries[-n:]
+    return entries
 
 
 def get_command_history(limit: int = 30) -> list:
     entries = []
     try:
         for day_dir in sorted(glob.glob(os.path.join(HISTORY_DIR, "*")), reverse=True):
+            # 新形式: 日付ごとの events.jsonl（1イベント1行・追記順）
+            day_entries = read_jsonl_tail(os.path.join(day_dir, "events.jsonl"), limit)
+            entries.extend(reversed(day_entries))
+            if len(entries) >= limit:
+                return entries[:limit]
+            # 旧形式: 1イベント1ファイル
             for fpath in sorted(glob.glob(os.path.join(day_dir, "*.json")), reverse=True):
                 with open(fpath, 'r', encoding='utf-8') as f:
                     entries.append(json.load(f))
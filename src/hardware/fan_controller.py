@@ -6,10 +6,18 @@ PWMファン制御モジュール
 """
 
 import os
+import sys
 import time
 import logging
 from typing import Optional
 
+# 共通ヘルパは src 直下。src/hardware から直接起動された時だけ src を探索パスに足す
+try:
+    from system_sampler import get_sampler
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from system_sampler import get_sampler
+
 try:
     import RPi.GPIO as GPIO
 except ImportError:
@@ -93,13 +101,13 @@ class FanController:
         Returns:
             CPU温度（℃）
         """
-        try:
-            with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                temp = float(f.read().strip()) / 1000.0
-                return temp
-        except Exception as e:
-            self.logger.error(f"CPU温度取得エラー: {e}")
+        # 温度ファイルは SystemSampler が開きっぱなしの fd を pread で読む
+        sampler = get_sampler()
+        temp = sampler.read_cpu_temp()
+        if temp is None:
+            self.logger.error(f"CPU温度取得エラー: {sampler.last_temp_error}")
             return 50.0  # デフォルト値
+        return temp
     
     def calculate_fan_speed(self, temperature: float) -> tuple:
         """
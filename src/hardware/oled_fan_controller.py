@@ -10,20 +10,39 @@ shipOS OLED・ファン制御統合モジュール
 """
 
 import os
-import json
+import re
+import math
 import time
 import logging
-import socket
 import subprocess
 import signal
+import selectors
 import sys
+import threading
+from bisect import bisect_right
 from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from datetime import timezone, timedelta
+from typing import Optional, Dict, Any, Tuple
 
 from fan_controller import FanController
 from oled_display import OLEDDisplay
 
+# 共通ヘルパは src 直下（HealthMonitor / LINE Bot と共用）。
+# このスクリプトは src/hardware から直接起動されるので、見つからない時だけ src を探索パスに足す
+try:
+    from system_sampler import get_sampler, check_network, get_service_state
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from system_sampler import get_sampler, check_network, get_service_state
+from state_cache import JsonStatCache, json_loads, json_dumps, iso_now
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
 
 JST = timezone(timedelta(hours=9))
 
@@ -53,6 +72,10 @@ SHIP_MODE_ASCII = {
     "SHUTDOWN":    "...",
 }
 
+# モード → (表示名, ASCII) を1回のルックアップで引くためのテーブル
+_MODE_TABLE = {mode: (SHIP_MODE_DISPLAY[mode], SHIP_MODE_ASCII[mode]) for mode in SHIP_MODE_DISPLAY}
+_DEFAULT_MODE_PAIR = ("SAIL", ">===>")
+
 # AI状態 → 顔文字
 AI_STATE_FACE = {
     "idle":         "(-_-)",
@@ -61,16 +84,65 @@ AI_STATE_FACE = {
     "error":        "(x_x)",
 }
 
+# AI状態文字列のキーワード種別（先読みで重なりも含めて1回の走査で全部拾う）
+_AI_STATE_RX = re.compile(
+    r"(?=(?P<error>error)|(?P<fail>fail)|(?P<busy>acting|planning)"
+    r"|(?P<listen>listen)|(?P<wait>wait)|(?P<approval>approval))"
+)
+
+# 顔文字の優先順位（上から最初に該当したもの）
+_FACE_RULES = (
+    ("error", AI_STATE_FACE["error"]),
+    ("busy", AI_STATE_FACE["active"]),
+    ("listen", "(o_o)"),
+    ("wait", "(-_-)zZ"),
+)
+
+# Mood補正 (該当キーワード, スコア増減, reasonsキー) 上から最初に該当したもの
+_MOOD_AI_RULES = (
+    (frozenset({"error", "fail"}), -25, "ai_error"),
+    (frozenset({"wait", "approval"}), -8, "ai_waiting"),
+    (frozenset({"busy"}), 2, "ai_working"),
+)
+
+
+@lru_cache(maxsize=32)
+def _ai_state_kinds(state: str) -> frozenset:
+    return frozenset(m.lastgroup for m in _AI_STATE_RX.finditer((state or "").lower()))
+
+
+@lru_cache(maxsize=32)
 def get_ai_face(state: str) -> str:
-    st = (state or "").lower()
-    if "error" in st: return AI_STATE_FACE["error"]
-    if "acting" in st or "planning" in st: return AI_STATE_FACE["active"]
-    if "listen" in st: return "(o_o)"
-    if "wait" in st: return "(-_-)zZ"
+    kinds = _ai_state_kinds(state)
+    for kind, face in _FACE_RULES:
+        if kind in kinds:
+            return face
     return AI_STATE_FACE["idle"]
 
 
-@dataclass
+# Mood判定テーブル（bisect_right で区間を引く。閾値ちょうどは上側の区間に入る）
+# 「x > t」の境界は nextafter(t) を閾値にして「x >= nextafter(t)」として扱う
+_CPU_THRESHOLDS = (math.nextafter(0.0, math.inf), math.nextafter(45.0, math.inf), 65.0, 75.0)
+_CPU_BUCKETS = ((0, None), (5, "cpu_cool"), (0, None), (-20, "cpu_warm"), (-35, "cpu_hot"))
+
+_DISK_THRESHOLDS = (85.0, 92.0)
+_DISK_BUCKETS = ((3, "disk_ok"), (-15, "disk_high"), (-30, "disk_critical"))
+
+_IDLE_THRESHOLDS = (math.nextafter(10.0, math.inf), 60.0, 180.0)  # 分
+_IDLE_DELTAS = (6, 0, -12, -22)
+
+# スコア → 表情＆一言（最下段は CPU温度で出し分け）
+_MOOD_THRESHOLDS = (35, 55, 70, 85)
+_MOOD_FACES = (
+    None,
+    ("😨", "なんか不安たい…マスター"),
+    ("😗", "ちょい構ってほしか〜"),
+    ("😊", "穏やかな航海ばい〜"),
+    ("😎", "調子よか！任せんしゃい♪"),
+)
+
+
+@dataclass(slots=True)
 class Mood:
     score: int           # 0-100
     emoji: str           # 😊😗😨😤🥶🥵😎 etc
@@ -92,6 +164,7 @@ class OLEDFanController:
     MOOD_LOG_PATH = os.path.join(STATE_DIR, "mood_log.jsonl")
     LAST_TOUCH_PATH = os.path.join(STATE_DIR, "last_user_touch.txt")
     LINE_STATUS_FILE = "/tmp/shipos_line_status.json"
+    MOOD_LOG_MAX_BYTES = 8 * 1024 * 1024  # 超えたら mood_log.jsonl.1 へローテート
 
     # 更新間隔 (環境変数 OLED_SCROLL_SPEED から取得、デフォルト 0.085秒 で以前より15%高速化)
     OLED_UPDATE_INTERVAL = float(os.getenv("OLED_SCROLL_SPEED", "0.085"))
@@ -125,35 +198,63 @@ class OLEDFanController:
         self.fan_controller = FanController(enable_warnings=enable_fan_warnings)
         self.oled_display = OLEDDisplay()
 
-        # タイマー
-        self.last_oled_update = 0.0
-        self.last_sys_update = 0.0
-        self.last_fan_update = 0.0
-        self.last_ai_state_check = 0.0
+        # タイマー（time.monotonic 基準。初回は必ず更新させる）
+        self.last_oled_update = float("-inf")
+        self.last_sys_update = float("-inf")
+        self.last_fan_update = float("-inf")
+        self.last_ai_state_check = float("-inf")
 
         # AI状態キャッシュ
         self.current_ai_state = "Idle"
         self.current_ai_task = ""
         self.current_voice_mode = "HYB"
 
+        # OLED各行の組み立て済み文字列（元データ更新時だけ作り直す）
+        self._composed_lines: Dict[str, str] = {}
+
         # shipOSモードキャッシュ
-        self.current_ship_mode = "autonomous"
+        self._set_ship_mode("autonomous")
+
+        # 状態JSONの読み込みキャッシュ（mtime+size が変わった時だけパース）
+        self._json_cache = JsonStatCache()
+        self._line_status_data: dict = {}
+        self._last_touch_ts: Optional[float] = None
+        self._init_file_watch()
 
         # IP アドレスキャッシュ
         self._ip_cache = "..."
         self._ts_cache = "OFFLINE"
-        self._ip_cache_time = 0.0
+        self._ip_cache_time = float("-inf")
         self._ip_offset = 0
 
+        # スクロール用の連結済み文字列キャッシュ {元テキスト: (text+text, len)}
+        self._scroll_cache: Dict[str, Tuple[str, int]] = {}
+
+        # 直前にOLEDへ送ったフレーム（同一内容なら I2C 転送を省く）
+        self._last_frame: Optional[Tuple[str, ...]] = None
+
+        # OLED転送スレッド（最新フレーム1枚だけを保持するスロット経由で受け渡す）
+        self._frame_slot: Optional[Tuple[str, ...]] = None
+        self._frame_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._oled_stop = threading.Event()
+        self._oled_thread = threading.Thread(target=self._oled_worker, name="oled-worker", daemon=True)
+        self._oled_thread.start()
+
         # System info cache
         self._system_info_cache = {}
+        self._sampler = get_sampler()
 
         # Mood
         self.current_mood: Optional[Mood] = None
+        self._mood_fp = None  # moodログは開きっぱなしで追記する
 
         # 警告通知コールバック
         self.warning_callback = None
 
+        self._compose_ai_lines()
+        self._compose_sys_lines()
+
         self.logger.info("shipOS OLED・ファン制御システムを初期化しました")
 
     # ========== ユーザータッチ ==========
@@ -167,13 +268,68 @@ class OLEDFanController:
             self.logger.debug(f"touch更新失敗: {e}")
 
     def _read_last_touch_ts(self) -> Optional[float]:
+        if not self._file_changed(self.LAST_TOUCH_PATH):
+            return self._last_touch_ts
         try:
-            if not os.path.exists(self.LAST_TOUCH_PATH):
-                return None
             with open(self.LAST_TOUCH_PATH, "r", encoding="utf-8") as f:
-                return float(f.read().strip())
+                self._last_touch_ts = float(f.read().strip())
         except Exception:
-            return None
+            self._last_touch_ts = None
+        return self._last_touch_ts
+
+    # ========== 状態ファイル監視（inotify） ==========
+
+    def _init_file_watch(self):
+        """状態ファイルのあるディレクトリを inotify で監視（無ければポーリング）"""
+        self._watched_paths = {
+            self.AI_STATE_FILE, self.SHIP_MODE_FILE,
+            self.LAST_TOUCH_PATH, self.LINE_STATUS_FILE,
+        }
+        self._dirty_paths = set(self._watched_paths)  # 初回は全部読む
+        self._watch_dirs: Dict[int, str] = {}
+        self._inotify = None
+        if not INOTIFY_AVAILABLE:
+            return
+        inotify = None
+        try:
+            inotify = INotify()
+            mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.DELETE
+            for d in {os.path.dirname(p) for p in self._watched_paths}:
+                self._watch_dirs[inotify.add_watch(d, mask)] = d
+            self._inotify = inotify
+        except Exception as e:
+            self.logger.warning(f"inotify初期化失敗、ポーリングで継続: {e}")
+            self._watch_dirs.clear()
+            if inotify is not None:
+                inotify.close()  # 作りかけのfdを残さない
+
+    def _drain_file_events(self):
+        """溜まった inotify イベントを読んで変更フラグを立てる"""
+        for evt in self._inotify.read(timeout=0):
+            d = self._watch_dirs.get(evt.wd)
+            if d is None:
+                continue
+            path = os.path.join(d, evt.name)
+            if path in self._watched_paths:
+                self._dirty_paths.add(path)
+
+    def _file_changed(self, path: str) -> bool:
+        """前回読み込み以降に変更されたか（inotify無しでは常にTrue）"""
+        if self._inotify is None:
+            return True
+        self._drain_file_events()
+        if path in self._dirty_paths:
+            self._dirty_paths.discard(path)
+            return True
+        return False
+
+    def _close_file_watch(self):
+        if self._inotify is not None:
+            try:
+                self._inotify.close()
+            except Exception:
+                pass
+            self._inotify = None
 
     # ========== 警告コールバック ==========
 
@@ -186,9 +342,8 @@ class OLEDFanController:
     def read_ai_state(self) -> dict:
         """AI状態ファイルを読み込み"""
         try:
-            if os.path.exists(self.AI_STATE_FILE):
-                with open(self.AI_STATE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            return self._json_cache.get(self.AI_STATE_FILE)
+        except FileNotFoundError:
             return {"state": "Idle", "task": "", "timestamp": ""}
         except Exception as e:
             self.logger.error(f"AI状態読み込みエラー: {e}")
@@ -197,39 +352,55 @@ class OLEDFanController:
     def read_ship_mode(self) -> str:
         """shipOSモードを読み込み"""
         try:
-            if os.path.exists(self.SHIP_MODE_FILE):
-                with open(self.SHIP_MODE_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return data.get("mode", "autonomous")
+            data = self._json_cache.get(self.SHIP_MODE_FILE)
+            return data.get("mode", "autonomous")
         except Exception:
             pass
         return "autonomous"
 
-    def update_ai_state(self):
-        """AI状態とshipOSモードを更新"""
-        current_time = time.time()
-
-        if current_time - self.last_ai_state_check < self.AI_STATE_CHECK_INTERVAL:
-            return
+    def update_ai_state(self, now: float):
+        """AI状態とshipOSモードを更新（inotify有効時は変更があった時だけ読む）"""
+        if self._inotify is None:
+            if now - self.last_ai_state_check < self.AI_STATE_CHECK_INTERVAL:
+                return
+            self.last_ai_state_check = now
+
+        if self._file_changed(self.AI_STATE_FILE):
+            ai_data = self.read_ai_state()
+            self.current_ai_state = ai_data.get("ai_status", "idle") or "idle"
+            self.current_ai_task = ai_data.get("goal", "") or ""
+            self.current_voice_mode = ai_data.get("voice_mode", "HYB") or "HYB"
+            self._compose_ai_lines()
+        if self._file_changed(self.SHIP_MODE_FILE):
+            self._set_ship_mode(self.read_ship_mode())
+
+    def _set_ship_mode(self, mode: str):
+        """モードを更新し、表示用の文字列ペアもここで1回だけ引いておく"""
+        self.current_ship_mode = mode
+        self._mode_pair = _MODE_TABLE.get(mode, _DEFAULT_MODE_PAIR)
+        mode_disp, mode_ascii = self._mode_pair
+        self._composed_lines["mode"] = f"shipOS: {mode_disp} {mode_ascii}" + " " * 5
+
+    def _compose_ai_lines(self):
+        """AI状態由来の行（DEST / AI顔文字）を組み立て"""
+        self._composed_lines["dest"] = f"DEST: {self.current_ai_task}" + " " * 8  # 長文もそのまま流す
 
-        self.last_ai_state_check = current_time
+        # AI: (´・ω・`) [HYB] のような表示にする
+        v_mode = self.current_voice_mode[:3].upper() or "HYB"
+        self._composed_lines["ai"] = f"AI: {get_ai_face(self.current_ai_state)} [{v_mode}]"[:21]
 
-        ai_data = self.read_ai_state()
-        self.current_ai_state = ai_data.get("ai_status", "idle") or "idle"
-        self.current_ai_task = ai_data.get("goal", "") or ""
-        self.current_voice_mode = ai_data.get("voice_mode", "HYB") or "HYB"
-        self.current_ship_mode = self.read_ship_mode()
+    def _compose_sys_lines(self):
+        """システム状態由来の行（温度/ディスク・IP）を組み立て"""
+        sys_info = self._system_info_cache
+        cpu_t = sys_info.get("cpu_temp", 0)
+        disk_pct = sys_info.get("disk_percent", 0)
+        self._composed_lines["sys"] = f"TEMP:{cpu_t:.0f}C DISK:{disk_pct:.0f}%" + " " * 5
+        self._composed_lines["ip"] = f"LAN: {self._ip_cache}  TS: {self._ts_cache}" + " " * 5
 
     def is_ai_service_active(self) -> bool:
-        """systemctl APIでAIエージェントの生存確認"""
+        """systemd (D-Bus / systemctl) でAIエージェントの生存確認"""
         try:
-            result = subprocess.run(
-                ["systemctl", "is-active", "autonomous-ai.service"],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            return result.stdout.strip() == "active"
+            return get_service_state("autonomous-ai.service", timeout=2) == "active"
         except Exception as e:
             self.logger.debug(f"AI service status check failed: {e}")
             return False
@@ -237,15 +408,15 @@ class OLEDFanController:
     def _force_mode(self, mode: str, reason: str):
         """設定ファイルに直接モードを書き込む（緊急用）"""
         try:
-            self.current_ship_mode = mode
+            self._set_ship_mode(mode)
             os.makedirs(os.path.dirname(self.SHIP_MODE_FILE), exist_ok=True)
-            with open(self.SHIP_MODE_FILE, "r", encoding="utf-8") as f:
-                state = json.load(f)
+            with open(self.SHIP_MODE_FILE, "rb") as f:
+                state = json_loads(f.read())
             state["mode"] = mode
-            state["since"] = datetime.now().isoformat()
+            state["since"] = iso_now()
             state["override"] = True
-            with open(self.SHIP_MODE_FILE, "w", encoding="utf-8") as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
+            with open(self.SHIP_MODE_FILE, "wb") as f:
+                f.write(json_dumps(state, indent=True))
             self.logger.warning(f"強制モード移行: {mode} ({reason})")
         except Exception as e:
             self.logger.error(f"モード強制移行失敗: {e}")
@@ -253,11 +424,12 @@ class OLEDFanController:
     def _check_line_status(self) -> str:
         """LINEの送受信状態をチェックして文字列を返す"""
         try:
-            if not os.path.exists(self.LINE_STATUS_FILE):
-                return ""
-            
-            with open(self.LINE_STATUS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if self._file_changed(self.LINE_STATUS_FILE):
+                try:
+                    self._line_status_data = self._json_cache.get(self.LINE_STATUS_FILE)
+                except FileNotFoundError:
+                    self._line_status_data = {}
+            data = self._line_status_data
             
             # 定義されたTTL (デフォルト3秒) 以内のステータスのみ有効
             ttl = float(os.getenv("LINE_STATUS_TTL", "3.0"))
@@ -276,21 +448,12 @@ class OLEDFanController:
 
     def get_system_info(self) -> dict:
         info = {"cpu_temp": 0.0, "disk_percent": 0.0, "cpu_percent": 0.0, "mem_percent": 0.0}
-        try:
-            with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                info["cpu_temp"] = float(f.read().strip()) / 1000.0
-        except Exception: pass
-        try:
-            import psutil
-            info["disk_percent"] = psutil.disk_usage("/").percent
-            info["cpu_percent"] = psutil.cpu_percent()
-            info["mem_percent"] = psutil.virtual_memory().percent
-        except Exception: pass
+        info.update(self._sampler.sample(self.SYS_UPDATE_INTERVAL))
         return info
 
-    def _update_ips(self):
+    def _update_ips(self, now: float):
         """IPアドレスを一括取得（60秒キャッシュ）"""
-        if time.time() - self._ip_cache_time < 60:
+        if now - self._ip_cache_time < 60:
             return
         
         # LAN
@@ -313,16 +476,12 @@ class OLEDFanController:
         except Exception:
             self._ts_cache = "OFFLINE"
             
-        self._ip_cache_time = time.time()
+        self._ip_cache_time = now
 
     # ========== ネット疎通 ==========
 
     def _check_network(self, host: str = "1.1.1.1", port: int = 53, timeout: float = 0.7) -> bool:
-        try:
-            with socket.create_connection((host, port), timeout=timeout):
-                return True
-        except Exception:
-            return False
+        return check_network(host, port, timeout)
 
     # ========== Mood算出（aynyan人格） ==========
 
@@ -340,20 +499,15 @@ class OLEDFanController:
         reasons: Dict[str, Any] = {}
 
         # CPU温度
-        if cpu_t >= 75:
-            score -= 35; reasons["cpu_hot"] = cpu_t
-        elif cpu_t >= 65:
-            score -= 20; reasons["cpu_warm"] = cpu_t
-        elif 0 < cpu_t <= 45:
-            score += 5; reasons["cpu_cool"] = cpu_t
+        delta, key = _CPU_BUCKETS[bisect_right(_CPU_THRESHOLDS, cpu_t)]
+        score += delta
+        if key:
+            reasons[key] = cpu_t
 
         # ディスク
-        if disk >= 92:
-            score -= 30; reasons["disk_critical"] = disk
-        elif disk >= 85:
-            score -= 15; reasons["disk_high"] = disk
-        else:
-            score += 3; reasons["disk_ok"] = disk
+        delta, key = _DISK_BUCKETS[bisect_right(_DISK_THRESHOLDS, disk)]
+        score += delta
+        reasons[key] = disk
 
         # ネット断
         if not net_ok:
@@ -362,42 +516,29 @@ class OLEDFanController:
         # 放置
         if idle_min is not None:
             reasons["idle_min"] = round(idle_min, 1)
-            if idle_min >= 180:
-                score -= 22
-            elif idle_min >= 60:
-                score -= 12
-            elif idle_min <= 10:
-                score += 6
+            score += _IDLE_DELTAS[bisect_right(_IDLE_THRESHOLDS, idle_min)]
         else:
             reasons["idle_unknown"] = True
 
         # AI状態補正
-        st = (ai_state or "").lower()
-        if "error" in st or "fail" in st:
-            score -= 25; reasons["ai_error"] = ai_state
-        elif "wait" in st or "approval" in st:
-            score -= 8; reasons["ai_waiting"] = ai_state
-        elif "acting" in st or "planning" in st:
-            score += 2; reasons["ai_working"] = ai_state
+        kinds = _ai_state_kinds(ai_state)
+        for keys, delta, key in _MOOD_AI_RULES:
+            if kinds & keys:
+                score += delta; reasons[key] = ai_state
+                break
 
         score = max(0, min(100, int(round(score))))
 
         # aynyan人格に合わせた表情＆一言
+        face = _MOOD_FACES[bisect_right(_MOOD_THRESHOLDS, score)]
         if not net_ok:
             emoji, line = "🥶", "通信きつか…マスター、孤独ばい"
-        elif score >= 85:
-            emoji, line = "😎", "調子よか！任せんしゃい♪"
-        elif score >= 70:
-            emoji, line = "😊", "穏やかな航海ばい〜"
-        elif score >= 55:
-            emoji, line = "😗", "ちょい構ってほしか〜"
-        elif score >= 35:
-            emoji, line = "😨", "なんか不安たい…マスター"
+        elif face is not None:
+            emoji, line = face
+        elif cpu_t >= 70:
+            emoji, line = "🥵", "アッツアツ！冷やして〜"
         else:
-            if cpu_t >= 70:
-                emoji, line = "🥵", "アッツアツ！冷やして〜"
-            else:
-                emoji, line = "😤", "だいぶキツか…助けて"
+            emoji, line = "😤", "だいぶキツか…助けて"
 
         return Mood(score=score, emoji=emoji, line=line, reasons=reasons)
 
@@ -405,7 +546,7 @@ class OLEDFanController:
         """JSONLで保存（航海日誌素材）"""
         try:
             rec = {
-                "ts": datetime.now(JST).isoformat(timespec="seconds"),
+                "ts": iso_now(JST),
                 "ship_mode": self.current_ship_mode,
                 "system": {
                     "cpu_temp": round(float(system_info.get("cpu_temp", 0.0)), 1),
@@ -417,21 +558,38 @@ class OLEDFanController:
                 "ai": {"state": ai_state, "task": ai_task},
                 "mood": {"score": mood.score, "emoji": mood.emoji, "line": mood.line, "reasons": mood.reasons},
             }
-            with open(self.MOOD_LOG_PATH, "a", encoding="utf-8") as f:
-                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            if self._mood_fp is None:
+                self._mood_fp = open(self.MOOD_LOG_PATH, "ab", buffering=0)
+            self._mood_fp.write(json_dumps(rec, newline=True))
+            self._rotate_mood_log()
         except Exception as e:
             self.logger.debug(f"moodログ書き込み失敗: {e}")
+            self._close_mood_log()
+
+    def _rotate_mood_log(self):
+        """サイズ上限を超えたら .1 に退避して次回書き込み時に開き直す"""
+        if os.fstat(self._mood_fp.fileno()).st_size <= self.MOOD_LOG_MAX_BYTES:
+            return
+        self._close_mood_log()
+        os.replace(self.MOOD_LOG_PATH, self.MOOD_LOG_PATH + ".1")
+        self.logger.info("moodログをローテートしました")
+
+    def _close_mood_log(self):
+        if self._mood_fp is not None:
+            try:
+                self._mood_fp.close()
+            except Exception:
+                pass
+            self._mood_fp = None
 
     # ========== ファン制御 ==========
 
-    def update_fan(self) -> dict:
+    def update_fan(self, now: float) -> dict:
         """ファン制御を更新"""
-        current_time = time.time()
-
-        if current_time - self.last_fan_update < self.FAN_UPDATE_INTERVAL:
+        if now - self.last_fan_update < self.FAN_UPDATE_INTERVAL:
             return {}
 
-        self.last_fan_update = current_time
+        self.last_fan_update = now
 
         fan_status = self.fan_controller.update()
 
@@ -446,13 +604,13 @@ class OLEDFanController:
 
     # ========== システム状態定期計算 ==========
 
-    def update_sys_state(self):
+    def update_sys_state(self, now: float):
         """システム状態とMoodを定期計算（OLED描画とは非同期）"""
-        current_time = time.time()
-        if current_time - self.last_sys_update < self.SYS_UPDATE_INTERVAL:
+        if now - self.last_sys_update < self.SYS_UPDATE_INTERVAL:
             return
 
-        self.last_sys_update = current_time
+        self.last_sys_update = now
+        self._scroll_cache.clear()
 
         # システム情報取得
         system_info = self.get_system_info()
@@ -460,7 +618,8 @@ class OLEDFanController:
         self._system_info_cache = system_info
         
         # IP更新
-        self._update_ips()
+        self._update_ips(now)
+        self._compose_sys_lines()
 
         # EMERGENCY / STORM 自動切替
         cpu_t = system_info.get("cpu_temp", 0.0)
@@ -483,76 +642,83 @@ class OLEDFanController:
 
     def _scroll_text(self, text: str, offset: int) -> str:
         MAX_CHARS = 21
-        if len(text) <= MAX_CHARS:
+        cached = self._scroll_cache.get(text)
+        if cached is None:
+            cached = self._scroll_cache[text] = (text + text, len(text))
+        doubled, length = cached
+        if length <= MAX_CHARS:
             return text
-        doubled = text + text
-        start = offset % len(text)
+        start = offset % length
         return doubled[start:start + MAX_CHARS]
 
-    def render_oled(self, fan_status: dict):
+    def render_oled(self, fan_status: dict, now: float):
         """OLED表示を0.2秒間隔でスクロール更新"""
-        current_time = time.time()
-
-        if current_time - self.last_oled_update < self.OLED_UPDATE_INTERVAL:
+        if now - self.last_oled_update < self.OLED_UPDATE_INTERVAL:
             return
 
-        self.last_oled_update = current_time
+        self.last_oled_update = now
 
         # 生存確認（AI OFFLINE / AT ANCHOR の割り込み描画）
         if not self.is_ai_service_active():
-            self.oled_display.render_lines([
+            self._push_frame((
                 "=== 停泊中 ===",
                 "",
                 "AI OFFLINE",
                 "⚓",
                 ""
-            ])
+            ))
             return
 
-        # キャッシュから情報取得
-        mode_disp = SHIP_MODE_DISPLAY.get(self.current_ship_mode, "SAIL")
-        mode_ascii = SHIP_MODE_ASCII.get(self.current_ship_mode, ">===>")
-        ai_face = get_ai_face(self.current_ai_state)
-        goal_short = self.current_ai_task[:20] if self.current_ai_task else "NONE"
-        ip_lan = self._ip_cache
-        ip_ts = getattr(self, "_ts_cache", "OFFLINE")
-
-        sys_info = getattr(self, "_system_info_cache", {})
-        cpu_t = sys_info.get("cpu_temp", 0)
-        disk_pct = sys_info.get("disk_percent", 0)
-
-        # 5行構成用の元テキストにパディングを追加してスクロール感を出す
+        # 組み立て済みの行（パディング込み）をキャッシュから取得
+        lines = self._composed_lines
         line_stat = self._check_line_status()
-        
-        mode_line = f"shipOS: {mode_disp} {mode_ascii}" + " " * 5
-        
-        sys_log = f"TEMP:{cpu_t:.0f}C DISK:{disk_pct:.0f}%" + " " * 5
-        ip_line = f"LAN: {ip_lan}  TS: {ip_ts}" + " " * 5
-        
         if line_stat:
             # LINE割り込みがある場合はDEST欄を上書きして強調
             dest_log = f"*** {line_stat} ***" + " " * 8
         else:
-            dest_log = f"DEST: {self.current_ai_task}" + " " * 8 # 長文もそのまま流す
+            dest_log = lines["dest"]
 
         # 上3行: 右→左スクロール（波のように位相をずらす）
-        line1 = self._scroll_text(mode_line, self._ip_offset)
+        line1 = self._scroll_text(lines["mode"], self._ip_offset)
         line2 = self._scroll_text(dest_log, self._ip_offset + 3)
-        line3 = self._scroll_text(sys_log, self._ip_offset + 6)
+        line3 = self._scroll_text(lines["sys"], self._ip_offset + 6)
         
         # 4行目: AI状態（顔文字）等 - 固定
-        # AI: (´・ω・`) [HYB] のような表示にする
-        v_mode = self.current_voice_mode[:3].upper()
-        if not v_mode:
-             v_mode = "HYB"
-        line4 = f"AI: {ai_face} [{v_mode}]"[:21]
+        line4 = lines["ai"]
         
         # 5行目: IPテロップ
-        line5 = self._scroll_text(ip_line, self._ip_offset)
+        line5 = self._scroll_text(lines["ip"], self._ip_offset)
 
-        self.oled_display.render_lines([line1, line2, line3, line4, line5])
+        self._push_frame((line1, line2, line3, line4, line5))
         self._ip_offset += 1
 
+    def _push_frame(self, frame: Tuple[str, ...]):
+        """前フレームと内容が同じなら描画をスキップ（スクロール不要な静止画面で効く）"""
+        if frame == self._last_frame:
+            return
+        self._last_frame = frame
+        with self._frame_lock:
+            self._frame_slot = frame  # 未転送の古いフレームは捨てる
+        self._frame_ready.set()
+
+    def _oled_worker(self):
+        """OLED転送専用スレッド（I2C転送の待ちをメインループから切り離す）"""
+        while not self._oled_stop.is_set():
+            if not self._frame_ready.wait(0.5):
+                continue
+            self._frame_ready.clear()
+            with self._frame_lock:
+                frame, self._frame_slot = self._frame_slot, None
+            if frame is not None:
+                self.oled_display.render_lines(list(frame))
+
+    def _stop_oled_worker(self):
+        """転送スレッドを止める（以降はメインスレッドから直接描画する）"""
+        self._oled_stop.set()
+        self._frame_ready.set()
+        if self._oled_thread.is_alive():
+            self._oled_thread.join(timeout=2.0)
+
     # ========== メインループ ==========
 
     def boot_sequence(self):
@@ -626,25 +792,35 @@ class OLEDFanController:
         # 出港テロップ
         self.oled_display.show_message("shipOS BCNOFNe\nSetting Sail...", 1.5)
 
+        # 状態ファイルの変更（inotify）か次の更新期限まで待つ
+        sel = selectors.DefaultSelector()
+        if self._inotify is not None:
+            sel.register(self._inotify.fileno(), selectors.EVENT_READ)
+
         try:
             fan_status = {}
 
             while True:
+                # ループ1周につき時刻は1回だけ取得（間隔判定は単調時計）
+                now = time.monotonic()
+
                 # AI状態 + モード更新
-                self.update_ai_state()
+                self.update_ai_state(now)
 
                 # ファン制御
-                new_fan_status = self.update_fan()
+                new_fan_status = self.update_fan(now)
                 if new_fan_status:
                     fan_status = new_fan_status
 
                 # システム状態更新
-                self.update_sys_state()
+                self.update_sys_state(now)
 
                 # OLED表示更新（スクロール）
-                self.render_oled(fan_status)
+                self.render_oled(fan_status, now)
 
-                time.sleep(0.05)
+                timeout = self._next_deadline() - time.monotonic()
+                if timeout > 0:
+                    sel.select(timeout)
 
         except KeyboardInterrupt:
             self.logger.info("終了シグナルを受信しました")
@@ -653,17 +829,33 @@ class OLEDFanController:
             self.logger.error(f"予期しないエラー: {e}", exc_info=True)
 
         finally:
+            sel.close()
             self.cleanup()
 
+    def _next_deadline(self) -> float:
+        """次にどれかの定期更新が必要になる時刻（time.monotonic 基準）"""
+        deadline = min(
+            self.last_oled_update + self.OLED_UPDATE_INTERVAL,
+            self.last_sys_update + self.SYS_UPDATE_INTERVAL,
+            self.last_fan_update + self.FAN_UPDATE_INTERVAL,
+        )
+        if self._inotify is None:
+            deadline = min(deadline, self.last_ai_state_check + self.AI_STATE_CHECK_INTERVAL)
+        return deadline
+
     def cleanup(self):
         """クリーンアップ"""
         self.logger.info("投錨。全機関停止...")
+        self._stop_oled_worker()
         self.oled_display.show_message(" \nANCHOR DOWN...\nSYSTEM HALT", 1.5)
         time.sleep(1.5)
         self.oled_display.show_message(" \nSAFE POWER OFF\nSEE YOU, MASTER.", 1.5)
         time.sleep(1.5)
         self.oled_display.clear()
         self.fan_controller.cleanup()
+        self._close_mood_log()
+        self._close_file_watch()
+        self._sampler.close()
         self.logger.info("クリーンアップ完了")
 
 
@@ -6,14 +6,15 @@
 """
 
 import os
-import subprocess
 import time
-import json
 import psutil
-from datetime import datetime
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from system_sampler import get_sampler, check_network, get_service_state
+from state_cache import json_dumps, iso_now
+
 
 class HealthStatus:
     OK = "OK"
@@ -22,24 +23,27 @@ class HealthStatus:
     UNKNOWN = "UNKNOWN"
 
 
+@dataclass(slots=True)
 class HealthCheck:
     """個別チェック結果"""
-    def __init__(self, name: str, status: str, value: Any, message: str = ""):
-        self.name = name
-        self.status = status
-        self.value = value
-        self.message = message
-        self.timestamp = datetime.now().isoformat()
+    name: str
+    status: str
+    value: Any
+    message: str = ""
+    timestamp: str = field(default_factory=iso_now)
 
 
 class HealthMonitor:
     """統合ヘルスモニタ"""
     
     HISTORY_FILE = "/home/pi/autonomous_ai_BCNOFNe_system/state/health_history.jsonl"
+    HISTORY_MAX_BYTES = 8 * 1024 * 1024  # 超えたら .1 へローテート
     
     def __init__(self):
         self.last_results: List[HealthCheck] = []
         self.ai_heartbeat: float = time.time()
+        self.sampler = get_sampler()
+        self._history_fp = None  # 履歴ファイルは開きっぱなしで追記する
         os.makedirs(os.path.dirname(self.HISTORY_FILE), exist_ok=True)
     
     def update_heartbeat(self):
@@ -50,8 +54,7 @@ class HealthMonitor:
     
     def check_cpu_temp(self) -> HealthCheck:
         try:
-            with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                temp = float(f.read().strip()) / 1000.0
+            temp = self.sampler.sample()["cpu_temp"]
             if temp >= 80:
                 return HealthCheck("CPU温度", HealthStatus.CRITICAL, temp, f"{temp:.1f}℃ 危険域！")
             elif temp >= 70:
@@ -62,19 +65,21 @@ class HealthMonitor:
     
     def check_ram(self) -> HealthCheck:
         try:
-            mem = psutil.virtual_memory()
-            if mem.percent >= 90:
-                return HealthCheck("RAM", HealthStatus.CRITICAL, mem.percent, f"{mem.percent:.1f}% 逼迫！")
-            elif mem.percent >= 80:
-                return HealthCheck("RAM", HealthStatus.WARN, mem.percent, f"{mem.percent:.1f}% 注意")
-            return HealthCheck("RAM", HealthStatus.OK, mem.percent, f"{mem.percent:.1f}% 正常")
+            pct = self.sampler.sample()["mem_percent"]
+            if pct >= 90:
+                return HealthCheck("RAM", HealthStatus.CRITICAL, pct, f"{pct:.1f}% 逼迫！")
+            elif pct >= 80:
+                return HealthCheck("RAM", HealthStatus.WARN, pct, f"{pct:.1f}% 注意")
+            return HealthCheck("RAM", HealthStatus.OK, pct, f"{pct:.1f}% 正常")
         except Exception:
             return HealthCheck("RAM", HealthStatus.UNKNOWN, 0, "取得不可")
     
     def check_disk(self, path: str = "/", name: str = "SSD") -> HealthCheck:
         try:
-            usage = psutil.disk_usage(path)
-            pct = usage.percent
+            if path == self.sampler.disk_path:
+                pct = self.sampler.sample()["disk_percent"]
+            else:
+                pct = psutil.disk_usage(path).percent
             if pct >= 90:
                 return HealthCheck(name, HealthStatus.CRITICAL, pct, f"{pct:.1f}% 容量逼迫！")
             elif pct >= 80:
@@ -94,16 +99,9 @@ class HealthMonitor:
         return HealthCheck("HDD", HealthStatus.CRITICAL, 0, "未マウント！")
     
     def check_network(self) -> HealthCheck:
-        try:
-            result = subprocess.run(
-                ["ping", "-c", "1", "-W", "3", "8.8.8.8"],
-                capture_output=True, timeout=5
-            )
-            if result.returncode == 0:
-                return HealthCheck("ネットワーク", HealthStatus.OK, True, "接続正常")
-            return HealthCheck("ネットワーク", HealthStatus.WARN, False, "応答なし")
-        except Exception:
-            return HealthCheck("ネットワーク", HealthStatus.WARN, False, "チェック失敗")
+        if check_network():
+            return HealthCheck("ネットワーク", HealthStatus.OK, True, "接続正常")
+        return HealthCheck("ネットワーク", HealthStatus.WARN, False, "応答なし")
     
     def check_ai_loop(self) -> HealthCheck:
         elapsed = time.time() - self.ai_heartbeat
@@ -115,11 +113,7 @@ class HealthMonitor:
     
     def check_service(self, service: str = "autonomous-ai") -> HealthCheck:
         try:
-            result = subprocess.run(
-                ["systemctl", "is-active", service],
-                capture_output=True, text=True, timeout=5
-            )
-            status = result.stdout.strip()
+            status = get_service_state(service)
             if status == "active":
                 return HealthCheck(f"サービス({service})", HealthStatus.OK, status, "稼働中")
             return HealthCheck(f"サービス({service})", HealthStatus.CRITICAL, status, f"状態: {status}")
@@ -172,13 +166,30 @@ class HealthMonitor:
     def _record(self, checks: List[HealthCheck]):
         """履歴記録"""
         try:
-            with open(self.HISTORY_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({
-                    "timestamp": datetime.now().isoformat(),
-                    "checks": [{
-                        "name": c.name, "status": c.status,
-                        "value": c.value, "message": c.message
-                    } for c in checks]
-                }, ensure_ascii=False) + "\n")
+            if self._history_fp is None:
+                self._history_fp = open(self.HISTORY_FILE, 'ab', buffering=0)
+            self._history_fp.write(json_dumps({
+                "timestamp": iso_now(),
+                "checks": [{
+                    "name": c.name, "status": c.status,
+                    "value": c.value, "message": c.message
+                } for c in checks]
+            }, newline=True))
+            if os.fstat(self._history_fp.fileno()).st_size > self.HISTORY_MAX_BYTES:
+                self._close_history()
+                os.replace(self.HISTORY_FILE, self.HISTORY_FILE + ".1")
         except Exception:
-            pass
+            self._close_history()
+    
+    def _close_history(self):
+        if self._history_fp is not None:
+            try:
+                self._history_fp.close()
+            except Exception:
+                pass
+            self._history_fp = None
+    
+    def close(self):
+        """履歴ファイルと温度センサのfdを閉じる"""
+        self._close_history()
+        self.sampler.close()
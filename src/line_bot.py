@@ -6,12 +6,21 @@ LINE Botモジュール
 """
 
 import os
-import json
-import subprocess
-import uuid
+import hmac
+import base64
+import hashlib
+import binascii
+from collections import OrderedDict
+import itertools
 import re
+import time
+import queue
+import atexit
+import tempfile
+import threading
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -33,11 +42,152 @@ from linebot.models import (
     QuickReply, QuickReplyButton, MessageAction
 )
 from version import get_full_version_string
+from state_cache import json_dumps
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+LINE_API_BASE = "https://api.line.me"
+
+# 質問パターン（_classify_input 用。1本のパターンにまとめて1回の search で判定）
+_QUERY_PATTERNS = (
+    r'[?？]',                    # 疑問符
+    r'(?:教えて|おしえて)',         # 教えて系
+    r'(?:天気|気温|温度)',          # 天気系
+    r'^(?:何|なに|なん)',           # 何〜
+    r'^(?:いつ|どこ|誰|だれ)',     # 疑問詞
+    r'(?:調べて|しらべて)',         # 調べて系
+    r'(?:どう|どんな|どれ)',       # どう系
+    r'(?:ある|ない|できる)\s*[?？]',  # 可否質問
+    r'(?:とは|って何|ってなに)',   # 定義質問
+    r'(?:意味|違い)',              # 意味・違い
+    r'(?:わかる|知って|しって)',   # 知識確認
+)
+_QUERY_RE = re.compile("|".join(_QUERY_PATTERNS))
+_IMPERATIVE_TAIL_RE = re.compile(r'(?:して|しろ|せよ|する)$')
+
+# 通知文の時刻表記
+DATETIME_FMT = "%Y年%m月%d日 %H:%M:%S"
+TIME_FMT = "%H:%M:%S"
+
+# 通知文テンプレート（固定部分はモジュール読み込み時に1回だけ作る）
+_STARTUP_TMPL = "🚀 システム起動\n\n自律AIエージェントが起動しました\n\n起動時刻: {ts}\nステータス: ✅ 正常起動\n"
+_SHUTDOWN_TMPL = "⏹️ システム停止\n\n自律AIエージェントが停止しました\n\n停止時刻: {ts}\n停止理由: {reason}\n"
+_EXEC_LOG_TMPL = (
+    "📊 実行ログ #{iteration}\n\n目標: {goal}\n\n実行コマンド数: {commands}\n"
+    "✅ 成功: {success}\n❌ 失敗: {fail}\n\n時刻: {ts}\n"
+)
+_ERROR_TMPL = "⚠️ エラー発生\n\n{error}\n\n発生時刻: {ts}\n"
+_COST_ALERT_TMPL = (
+    "{icon} コストアラート: {level}\n\nAPI使用料が閾値に達しました\n\n"
+    "現在のコスト: ¥{cost:.2f}\n閾値: ¥{threshold:.2f}\n\n{ts}\n"
+)
+_COST_ALERT_ICONS = {"注意": "⚠️", "警告": "🚨", "停止": "🛑"}
+_BILLING_CONFIRM_TMPL = (
+    "💰 課金確認\n\n以下のアクションを実行しますか?\n\n"
+    "アクション: {action}\n見積もりコスト: ¥{cost:.2f}\n\n"
+    "10分以内に応答がない場合は自動キャンセルされます。\n"
+)
+
+# 特別コマンド（前後空白を除き小文字化したテキストと完全一致）
+_STOP_CMDS = frozenset({"停止", "ストップ", "stop"})
+_START_CMDS = frozenset({"再開", "起動", "start", "スタート"})
+_STATUS_CMDS = frozenset({"状態", "ステータス", "status"})
+_HEALTH_CMDS = frozenset({"ヘルス", "health", "健康"})
+_LOGBOOK_CMDS = frozenset({"航海日誌", "日誌", "logbook"})
+_VERSION_CMDS = frozenset({"/version", "version"})
+
+# 返信もAIへの受け渡しもしない相づち（同じ正規化で完全一致。履歴にだけ残す）
+_IGNORED_TEXTS = frozenset({"", "w", "ww", "www", "ｗ", "ｗｗ", "ｗｗｗ", "笑", "草", "lol", "…", "...", "。"})
+
+_STOP_REPLY = "⛔ AIエージェントの自律ループを停止します。"
+_START_REPLY = "🚀 AIエージェントの自律ループを開始/再開します。"
+_STATUS_REPLY = "📊 システムは正常稼働中ですばい。"
+_HEALTH_REPLY = "🏥 システムヘルス：ALL GREEN"
+_LOGBOOK_REPLY = "📖 本日の日誌を取得します..."
+
+_now_str_cache: Dict[str, tuple] = {}
+
+
+def _atomic_write(path: str, data: bytes):
+    """
+    一時ファイルに書いてから os.replace で差し替える（読み手に書きかけを見せない）
+
+    一時ファイルは書き込みごとに同じディレクトリへ mkstemp で作る
+    （gunicorn の複数ワーカー・スレッドが同時に書いても互いの一時ファイルを潰さない）。
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), 0o644)  # mkstemp は 0600 なので他プロセスから読めるよう従来の権限に戻す
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _error_status(e: Exception) -> Optional[int]:
+    """httpx / line-bot-sdk の例外からHTTPステータスを取り出す"""
+    response = getattr(e, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(e, "status_code", None)
+    return status
+
+
+def _now_str(fmt: str = DATETIME_FMT) -> str:
+    """現在時刻を fmt で整形（同じ秒の間は前回の文字列を返す）"""
+    sec = int(time.time())
+    cached = _now_str_cache.get(fmt)
+    if cached is not None and cached[0] == sec:
+        return cached[1]
+    text = time.strftime(fmt, time.localtime(sec))
+    _now_str_cache[fmt] = (sec, text)
+    return text
+
+
+@dataclass(slots=True)
+class PendingConfirmation:
+    """応答待ちの課金確認"""
+    action: str
+    cost: float
+    timestamp: str
+    expires: float  # time.monotonic() 基準の期限
 
 
 class LINEBot:
     """LINE Bot クラス"""
     
+    OUTBOX_BATCH_WINDOW = 0.2       # 連続送信をまとめる待ち時間（秒）
+    MAX_MESSAGES_PER_PUSH = 5       # LINE push API の1リクエストあたり上限
+    PUSH_MAX_RETRIES = 3            # 429（レート制限）時の再送回数
+    PUSH_RETRY_BASE = 1.0           # 再送待ちの初期値（秒）。回数ごとに倍
+    SEEN_EVENT_IDS_MAX = 1024       # 再送判定用に覚えておく webhookEventId の数（ワーカー毎）
+    SEEN_EVENTS_DIR = "/tmp/shipos_line_seen"  # 処理済み webhookEventId の印ファイル（全ワーカーで共有）
+    WEBHOOK_MAX_BODY = 256 * 1024   # これを超えるWebhook本文は読まずに 413 で返す
+    HISTORY_QUEUE_MAX = 4096        # 履歴書き込み待ちの上限（溢れたらその場で書く）
+    CONFIRMATION_TTL = 600          # 課金確認の有効期限（秒）。案内文の「10分以内」
+    MAX_PENDING_CONFIRMATIONS = 256  # 期限内でもこれを超えたら古い順に捨てる
+    
+    LINE_STATUS_FILE = "/tmp/shipos_line_status.json"  # OLEDの「LINE 送信中/受信中」表示用
+    
+    INBOX_FILE = "/home/pi/autonomous_ai_BCNOFNe_system/commands/inbox.jsonl"
+    COMMAND_HISTORY_DIR = "/home/pi/autonomous_ai_BCNOFNe_system/commands/history"
+    HISTORY_EVENTS_FILE = "events.jsonl"  # 日付ディレクトリ内の履歴（1イベント1行）
+    
     def __init__(
         self,
         channel_access_token: Optional[str] = None,
@@ -60,50 +210,271 @@ class LINEBot:
             raise ValueError("LINE認証情報が設定されていません")
         
         self.line_bot_api = LineBotApi(self.channel_access_token)
-        self.handler = WebhookHandler(self.channel_secret)
+        # 署名は webhook() 側で検証済みなので、SDKが対応していれば再検証を省く
+        self._secret_bytes = self.channel_secret.encode("utf-8")
+        try:
+            self.handler = WebhookHandler(
+                self.channel_secret, skip_signature_verification=lambda: True
+            )
+        except TypeError:
+            self.handler = WebhookHandler(self.channel_secret)
+        # push/reply は keep-alive 接続を使い回す（毎回のTLSハンドシェイクを避ける）
+        self._client = self._create_http_client()
+        
+        # 送信キュー（send_message はキューに積むだけで、送信スレッドがまとめて push する）
+        self._outbox: "queue.Queue" = queue.Queue()
+        self._outbox_thread: Optional[threading.Thread] = None
+        self._outbox_lock = threading.Lock()
 
         import logging
         self.logger = logging.getLogger(__name__)
         self.logger.info("LINEBot initialized")
         
-        # 課金確認の待機状態を管理
-        self.pending_confirmations = {}
+        # 処理済みイベントID（LINEの再送で同じイベントを二重処理しない）。このワーカーが印を作った分
+        self._seen_event_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._seen_lock = threading.Lock()
+        
+        # インボックスは開きっぱなしで追記する（main側が .old へ退避したら開き直す）
+        self._inbox_fp = None
+        self._inbox_lock = threading.Lock()  # gthread ワーカーで複数リクエストが並行するため
+        self._dirs_ensured: set = set()  # 作成済みディレクトリ（makedirs の stat を省く）
+        
+        self._event_seq = itertools.count()  # イベントID用の連番（next() はスレッド間でも重複しない）
+        
+        # 履歴(history/日付/events.jsonl)は返信に関係ないので書き込みスレッドに任せる
+        self._history_q: "queue.Queue" = queue.Queue(maxsize=self.HISTORY_QUEUE_MAX)
+        self._history_thread: Optional[threading.Thread] = None
+        self._history_fp = None
+        self._history_fp_day: Optional[str] = None
+        self._history_lock = threading.Lock()
+        atexit.register(self.close)  # gunicorn ワーカー終了時も待ち分を書き切る
+        
+        # 特別コマンドの表（正規化済みテキスト → 返信文を作る関数）
+        self._cmd_table = self._build_command_table()
+        
+        # 課金確認の待機状態を管理（登録順。期限切れは先頭から捨てる）
+        self.pending_confirmations: "OrderedDict[str, PendingConfirmation]" = OrderedDict()
+        self._pending_lock = threading.Lock()
         
         self.logger.info(f"LINE Bot Initialized: {get_full_version_string()}")
         
         # LINE実行ログ送信フラグ（デフォルトOFF）
         self.exec_log_enabled = os.getenv("LINE_EXEC_LOG_ENABLED", "false").lower() == "true"
-        self._exec_log_timeout = None  # 一時有効化のタイムアウト
+        self._exec_log_timeout: Optional[float] = None  # 一時有効化の期限（time.monotonic 基準）
+    
+    def _create_http_client(self):
+        """
+        LINE Messaging API 用の常駐HTTPクライアントを作成
+        
+        httpx（HTTP/2可）→ requests.Session（HTTP/1.1 keep-alive）の順に使う。
+        どちらも無ければ None（SDK経由で送信）。
+        """
+        if not HTTPX_AVAILABLE:
+            if not REQUESTS_AVAILABLE:
+                return None
+            session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {self.channel_access_token}"
+            session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=8))
+            return session
+        kwargs = dict(
+            base_url=LINE_API_BASE,
+            headers={"Authorization": f"Bearer {self.channel_access_token}"},
+            limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60.0),
+            timeout=10.0,
+        )
+        try:
+            return httpx.Client(http2=True, **kwargs)
+        except ImportError:
+            # h2 未導入時は HTTP/1.1 keep-alive
+            return httpx.Client(**kwargs)
+    
+    def _push(self, to: str, messages: list):
+        """push API 呼び出し（失敗時は例外）"""
+        if self._client is None:
+            self.line_bot_api.push_message(to, messages)
+            return
+        self._post("/v2/bot/message/push", {
+            "to": to,
+            "messages": [m.as_json_dict() for m in messages]
+        })
+    
+    def _reply(self, reply_token: str, messages: list):
+        """reply API 呼び出し（失敗時は例外）"""
+        if self._client is None:
+            self.line_bot_api.reply_message(reply_token, messages)
+            return
+        self._post("/v2/bot/message/reply", {
+            "replyToken": reply_token,
+            "messages": [m.as_json_dict() for m in messages]
+        })
+    
+    def _post(self, path: str, payload: dict):
+        """常駐クライアントで API を呼ぶ（httpx は base_url 設定済み、requests は完全URL）"""
+        url = path if HTTPX_AVAILABLE else LINE_API_BASE + path
+        resp = self._client.post(url, json=payload, timeout=10.0)
+        resp.raise_for_status()
+    
+    def _reply_text(self, reply_token: str, text: str):
+        """テキスト1件を返信"""
+        self._reply(reply_token, [TextSendMessage(text=text)])
     
     def send_message(self, message: str, user_id: Optional[str] = None) -> bool:
         """
-        LINEメッセージを送信
+        LINEメッセージを送信キューに積む
+        
+        短時間に続いたメッセージは送信スレッドが最大5件ずつ1回の push にまとめる。
         
         Args:
             message: 送信するメッセージ
             user_id: 送信先ユーザーID（指定しない場合はデフォルト）
             
         Returns:
-            成功したらTrue
+            キューに積めたらTrue
+        """
+        target = user_id or self.target_user_id
+        
+        if not target:
+            self.logger.error("送信先ユーザーIDが設定されていません")
+            return False
+        
+        self.logger.info(f"LINEメッセージ送信試行: {message[:20]}...")
+        self._ensure_outbox_worker()
+        self._outbox.put((target, TextSendMessage(text=message)))
+        return True
+    
+    def _ensure_outbox_worker(self):
+        """送信スレッドを必要時に起動"""
+        with self._outbox_lock:
+            if self._outbox_thread is None or not self._outbox_thread.is_alive():
+                self._outbox_thread = threading.Thread(
+                    target=self._outbox_worker, name="line-outbox", daemon=True
+                )
+                self._outbox_thread.start()
+    
+    def _outbox_worker(self):
+        """キューを読み、OUTBOX_BATCH_WINDOW 内に届いた分をまとめて送信"""
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.OUTBOX_BATCH_WINDOW
+            while len(batch) < self.MAX_MESSAGES_PER_PUSH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._outbox.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush_batch(batch)
+            if stop:
+                return
+    
+    def _write_line_status(self, direction: str):
+        """
+        OLED向けに直近の送受信（"TX" / "RX"）を書き出す
+        
+        書き込みごとの一時ファイルから rename するので、OLED側が書きかけを読むことはなく、
+        受信（webhookスレッド）と送信（line-outbox スレッド）が同時に書いても壊れない。
         """
         try:
-            target = user_id or self.target_user_id
-            
-            if not target:
-                self.logger.error("送信先ユーザーIDが設定されていません")
-                return False
-            
-            self.logger.info(f"LINEメッセージ送信試行: {message[:20]}...")
-            self.line_bot_api.push_message(
-                target,
-                TextSendMessage(text=message)
-            )
-            self.logger.info("LINEメッセージ送信成功")
-            return True
-            
+            payload = json_dumps({"direction": direction, "timestamp": time.time()})
+            _atomic_write(self.LINE_STATUS_FILE, payload)
         except Exception as e:
-            self.logger.error(f"LINEメッセージ送信エラー: {e}")
+            self.logger.debug(f"LINE状態ファイル書き込み失敗: {e}")
+    
+    def _flush_batch(self, batch: list):
+        """送信先ごとに1回の push で送る"""
+        self._write_line_status("TX")
+        grouped: Dict[str, list] = {}
+        for target, msg in batch:
+            grouped.setdefault(target, []).append(msg)
+        for target, messages in grouped.items():
+            for attempt in range(self.PUSH_MAX_RETRIES + 1):
+                try:
+                    self._push(target, messages)
+                    self.logger.info(f"LINEメッセージ送信成功 ({len(messages)}件)")
+                    break
+                except Exception as e:
+                    # 429 は受理されていないので、間隔を倍々に空けて送り直す
+                    if _error_status(e) == 429 and attempt < self.PUSH_MAX_RETRIES:
+                        delay = self.PUSH_RETRY_BASE * (2 ** attempt)
+                        self.logger.warning(f"LINEレート制限: {delay:.0f}秒後に再送")
+                        time.sleep(delay)
+                        continue
+                    self.logger.error(f"LINEメッセージ送信エラー: {e}")
+                    break
+    
+    def _is_duplicate_event(self, event) -> bool:
+        """
+        処理済みの webhookEventId なら True（未処理なら記録して False）
+        
+        gunicorn の別ワーカーに再送が届いても弾けるよう、SEEN_EVENTS_DIR に O_EXCL で印を作って判定する。
+        印はワーカー毎に新しい方から SEEN_EVENT_IDS_MAX 件だけ残す。
+        印を作れない時はこのワーカー内の記録だけで判定する。
+        """
+        event_id = getattr(event, "webhook_event_id", None)
+        if not event_id:
             return False
+        with self._seen_lock:
+            if event_id in self._seen_event_ids:
+                return True
+            if event_id.isalnum():  # ULID。パスとして安全なものだけ印にする
+                try:
+                    self._ensure_dir(self.SEEN_EVENTS_DIR)
+                    fd = os.open(
+                        os.path.join(self.SEEN_EVENTS_DIR, event_id),
+                        os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644
+                    )
+                    os.close(fd)
+                except FileExistsError:
+                    return True  # 他のワーカーが処理済み
+                except OSError as e:
+                    self.logger.warning(f"再送判定の印を作成できません: {e}")
+            self._seen_event_ids[event_id] = None
+            if len(self._seen_event_ids) > self.SEEN_EVENT_IDS_MAX:
+                old_id, _ = self._seen_event_ids.popitem(last=False)
+                try:
+                    os.unlink(os.path.join(self.SEEN_EVENTS_DIR, old_id))
+                except OSError:
+                    pass
+        return False
+    
+    def _verify_signature(self, body: bytes, signature: str) -> bool:
+        """X-Line-Signature（本文の HMAC-SHA256 の base64）を検証"""
+        try:
+            expected = base64.b64decode(signature, validate=True)
+        except (binascii.Error, ValueError):
+            return False
+        mac = hmac.new(self._secret_bytes, body, hashlib.sha256).digest()
+        return hmac.compare_digest(mac, expected)
+    
+    def close(self):
+        """送信キュー・履歴キューを出し切ってHTTPクライアントとインボックスを閉じる"""
+        thread = self._outbox_thread
+        if thread is not None and thread.is_alive():
+            self._outbox.put(None)
+            thread.join(timeout=10)
+        self._outbox_thread = None
+        thread = self._history_thread
+        if thread is not None and thread.is_alive():
+            self._history_q.put(None)
+            thread.join(timeout=10)
+        self._history_thread = None
+        with self._history_lock:
+            self._close_history_fp()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._inbox_fp is not None:
+            self._inbox_fp.close()
+            self._inbox_fp = None
     
     def send_startup_notification(self) -> bool:
         """
@@ -112,14 +483,7 @@ class LINEBot:
         Returns:
             成功したらTrue
         """
-        message = f"""🚀 システム起動
-
-自律AIエージェントが起動しました
-
-起動時刻: {datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")}
-ステータス: ✅ 正常起動
-"""
-        return self.send_message(message)
+        return self.send_message(_STARTUP_TMPL.format(ts=_now_str()))
     
     def send_shutdown_notification(self, reason: str = "通常終了") -> bool:
         """
@@ -131,14 +495,7 @@ class LINEBot:
         Returns:
             成功したらTrue
         """
-        message = f"""⏹️ システム停止
-
-自律AIエージェントが停止しました
-
-停止時刻: {datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")}
-停止理由: {reason}
-"""
-        return self.send_message(message)
+        return self.send_message(_SHUTDOWN_TMPL.format(ts=_now_str(), reason=reason))
     
     def send_execution_log(
         self,
@@ -162,17 +519,10 @@ class LINEBot:
         success_count = sum(1 for r in results if r.get("success", False))
         fail_count = len(results) - success_count
         
-        message = f"""📊 実行ログ #{iteration}
-
-目標: {goal}
-
-実行コマンド数: {len(commands)}
-✅ 成功: {success_count}
-❌ 失敗: {fail_count}
-
-時刻: {datetime.now().strftime("%H:%M:%S")}
-"""
-        return self.send_message(message)
+        return self.send_message(_EXEC_LOG_TMPL.format(
+            iteration=iteration, goal=goal, commands=len(commands),
+            success=success_count, fail=fail_count, ts=_now_str(TIME_FMT)
+        ))
     
     def send_status(self, status_message: str) -> bool:
         """
@@ -193,10 +543,10 @@ class LINEBot:
         Returns:
             有効ならTrue
         """
-        import time
-        if self._exec_log_timeout and time.time() < self._exec_log_timeout:
-            return True
-        if self._exec_log_timeout and time.time() >= self._exec_log_timeout:
+        timeout = self._exec_log_timeout
+        if timeout is not None:
+            if time.monotonic() < timeout:
+                return True
             self._exec_log_timeout = None  # タイムアウト
         return self.exec_log_enabled
     
@@ -210,13 +560,7 @@ class LINEBot:
         Returns:
             成功したらTrue
         """
-        message = f"""⚠️ エラー発生
-
-{error_message}
-
-発生時刻: {datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")}
-"""
-        return self.send_message(message)
+        return self.send_message(_ERROR_TMPL.format(error=error_message, ts=_now_str()))
     
     def send_memory_summary(self, summary: str) -> bool:
         """
@@ -228,11 +572,11 @@ class LINEBot:
         Returns:
             成功したらTrue
         """
-        # LINEの文字数制限に対応（最大5000文字）
+        # LINEの文字数制限に対応（最大5000文字）。切り詰めと見出し付けを1回の連結で行う
         if len(summary) > 4900:
-            summary = summary[:4900] + "..."
-        
-        message = f"📚 メモリサマリー\n\n{summary}"
+            message = f"📚 メモリサマリー\n\n{summary[:4900]}..."
+        else:
+            message = f"📚 メモリサマリー\n\n{summary}"
         return self.send_message(message)
     
     def send_cost_alert(
@@ -252,23 +596,10 @@ class LINEBot:
         Returns:
             成功したらTrue
         """
-        icons = {
-            "注意": "⚠️",
-            "警告": "🚨",
-            "停止": "🛑"
-        }
-        icon = icons.get(alert_level, "⚠️")
-        
-        message = f"""{icon} コストアラート: {alert_level}
-
-API使用料が閾値に達しました
-
-現在のコスト: ¥{current_cost:.2f}
-閾値: ¥{threshold:.2f}
-
-{datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")}
-"""
-        return self.send_message(message)
+        return self.send_message(_COST_ALERT_TMPL.format(
+            icon=_COST_ALERT_ICONS.get(alert_level, "⚠️"), level=alert_level,
+            cost=current_cost, threshold=threshold, ts=_now_str()
+        ))
     
     def request_billing_confirmation(
         self,
@@ -288,15 +619,7 @@ API使用料が閾値に達しました
             成功したらTrue
         """
         try:
-            message = f"""💰 課金確認
-
-以下のアクションを実行しますか?
-
-アクション: {action_description}
-見積もりコスト: ¥{estimated_cost:.2f}
-
-10分以内に応答がない場合は自動キャンセルされます。
-"""
+            message = _BILLING_CONFIRM_TMPL.format(action=action_description, cost=estimated_cost)
             
             # クイックリプライボタンを追加
             quick_reply = QuickReply(items=[
@@ -304,17 +627,23 @@ API使用料が閾値に達しました
                 QuickReplyButton(action=MessageAction(label="❌ 拒否", text=f"拒否:{confirmation_id}"))
             ])
             
-            self.line_bot_api.push_message(
+            self._push(
                 self.target_user_id,
-                TextSendMessage(text=message, quick_reply=quick_reply)
+                [TextSendMessage(text=message, quick_reply=quick_reply)]
             )
             
             # 待機状態を記録
-            self.pending_confirmations[confirmation_id] = {
-                "action": action_description,
-                "cost": estimated_cost,
-                "timestamp": datetime.now().isoformat()
-            }
+            with self._pending_lock:
+                self._sweep_pending_confirmations()
+                # 件数の上限は追加時だけ見る（応答時に、応答中の確認を押し出さない）
+                while len(self.pending_confirmations) >= self.MAX_PENDING_CONFIRMATIONS:
+                    self.pending_confirmations.popitem(last=False)
+                self.pending_confirmations[confirmation_id] = PendingConfirmation(
+                    action=action_description,
+                    cost=estimated_cost,
+                    timestamp=datetime.now().isoformat(),
+                    expires=time.monotonic() + self.CONFIRMATION_TTL
+                )
             
             return True
             
@@ -330,13 +659,24 @@ API使用料が閾値に達しました
             Flaskアプリ
         """
         app = Flask(__name__)
+        # chunked 転送など Content-Length が無い場合も Werkzeug 側で読み込みを打ち切る
+        app.config["MAX_CONTENT_LENGTH"] = self.WEBHOOK_MAX_BODY
         
         @app.route("/webhook", methods=['POST'])
         def webhook():
+            # 巨大な本文は読み込み・HMAC計算の前に弾く
+            if (request.content_length or 0) > self.WEBHOOK_MAX_BODY:
+                self.logger.error(f"Webhook本文が大きすぎます: {request.content_length} bytes")
+                abort(413)
             # 署名検証
             signature = request.headers.get('X-Line-Signature', '')
-            body = request.get_data(as_text=True)
-            self.logger.info(f"Webhook受信: body_len={len(body)}, signature={signature}")
+            body_bytes = request.get_data()
+            self.logger.info(f"Webhook受信: body_len={len(body_bytes)}, signature={signature}")
+            
+            if not self._verify_signature(body_bytes, signature):
+                self.logger.error("Webhook署名検証失敗: チャンネルシークレットが正しいか確認してください")
+                abort(400)
+            body = body_bytes.decode("utf-8")
             
             try:
                 self.handler.handle(body, signature)
@@ -353,7 +693,11 @@ API使用料が閾値に達しました
         @self.handler.add(MessageEvent, message=TextMessage)
         def handle_message(event):
             text = event.message.text
+            if self._is_duplicate_event(event):
+                self.logger.info(f"再送イベントをスキップ: {event.webhook_event_id}")
+                return
             self.logger.info(f"メッセージ受信: {text} (from: {event.source.user_id})")
+            self._write_line_status("RX")
             
             # 内部処理
             try:
@@ -362,10 +706,7 @@ API使用料が閾値に達しました
                 self.logger.error(f"メッセージ処理内エラー: {e}")
                 # ユーザーへのフィードバック
                 try:
-                    self.line_bot_api.reply_message(
-                        event.reply_token,
-                        TextSendMessage(text=f"⚠️ 処理中にエラーが発生しましたばい：{e}")
-                    )
+                    self._reply_text(event.reply_token, f"⚠️ 処理中にエラーが発生しましたばい：{e}")
                 except:
                     pass
 
@@ -377,61 +718,34 @@ API使用料が閾値に達しました
             confirmation_id = text.split(":", 1)[1]
             response = "許可" if text.startswith("許可:") else "拒否"
             
-            if confirmation_id in self.pending_confirmations:
+            with self._pending_lock:
+                self._sweep_pending_confirmations()
+                pending = self.pending_confirmations.pop(confirmation_id, None)  # 応答済みを削除
+            
+            if pending is not None:
                 # 確認結果を保存
                 self._save_confirmation_result(confirmation_id, response)
                 
                 reply_text = f"✅ {response}しました" if response == "許可" else f"❌ {response}しました"
-                self.line_bot_api.reply_message(
-                    event.reply_token,
-                    TextSendMessage(text=reply_text)
-                )
-                del self.pending_confirmations[confirmation_id] # 応答済みを削除
+                self._reply_text(event.reply_token, reply_text)
             else:
-                self.line_bot_api.reply_message(
-                    event.reply_token,
-                    TextSendMessage(text="⚠️ 確認IDが見つかりません")
-                )
-        elif text.strip().lower() in ["/version", "version"]:
-            # バージョン情報の返答
-            v_str = get_full_version_string()
-            self.line_bot_api.reply_message(
-                event.reply_token,
-                TextSendMessage(text=f"📊 現在のシステムバージョン:\n{v_str}")
-            )
+                self._reply_text(event.reply_token, "⚠️ 確認IDが見つかりません")
         else:
-            # 特別コマンドをチェック
-            if text in ["停止", "ストップ", "stop", "STOP"]:
-                # AIを停止 (実際にはフラグ制御や外部プロセス操作など)
-                self.line_bot_api.reply_message(
-                    event.reply_token,
-                    TextSendMessage(text="⛔ AIエージェントの自律ループを停止します。")
-                )
-            elif text in ["再開", "起動", "start", "START", "スタート"]:
-                self.line_bot_api.reply_message(
-                    event.reply_token,
-                    TextSendMessage(text="🚀 AIエージェントの自律ループを開始/再開します。")
-                )
-            elif text in ["状態", "ステータス", "status", "STATUS"]:
-                self.line_bot_api.reply_message(
-                    event.reply_token,
-                    TextSendMessage(text="📊 システムは正常稼働中ですばい。")
-                )
+            # 特別コマンドをチェック（正規化したテキストで表引き1回）
+            key = text.strip().lower()
+            handler = self._cmd_table.get(key)
+            if handler is not None:
+                self._reply_text(event.reply_token, handler())
             
             # === shipOS コマンド ===
             elif text.lower().startswith("mode ") or text.startswith("モード "):
                 mode_name = text.split(" ", 1)[1].strip().lower()
                 # 簡易的な状態保存（実際の実装に合わせる）
-                self.line_bot_api.reply_message(
-                    event.reply_token, TextSendMessage(text=f"🎙️ モード変更リクエスト：{mode_name} を受け付けました。"))
-            
-            elif text in ["ヘルス", "health", "健康"]:
-                self.line_bot_api.reply_message(
-                    event.reply_token, TextSendMessage(text="🏥 システムヘルス：ALL GREEN"))
+                self._reply_text(event.reply_token, f"🎙️ モード変更リクエスト：{mode_name} を受け付けました。")
             
-            elif text in ["航海日誌", "日誌", "logbook"]:
-                self.line_bot_api.reply_message(
-                    event.reply_token, TextSendMessage(text="📖 本日の日誌を取得します..."))
+            elif key in _IGNORED_TEXTS:
+                # 相づちは分類せず、インボックス（AIの入力）にも入れない
+                self._save_event("ignored", text, event.source.user_id, inbox=False)
             
             else:
                 # 入力種別を判定してインボックスへ
@@ -439,18 +753,36 @@ API使用料が閾値に達しました
                 self._save_event(event_type, text, event.source.user_id)
                 
                 if event_type == "query":
-                    self.line_bot_api.reply_message(
-                        event.reply_token,
-                        TextSendMessage(text="🔍 質問を受け付けました。回答を準備中...")
-                    )
+                    self._reply_text(event.reply_token, "🔍 質問を受け付けました。回答を準備中...")
                 else:
-                    self.line_bot_api.reply_message(
-                        event.reply_token,
-                        TextSendMessage(text="📝 指示を受け付けました\n\n✅ 目標を設定しました:\n" + text)
-                    )
-
-        
-        return app
+                    self._reply_text(event.reply_token, "📝 指示を受け付けました\n\n✅ 目標を設定しました:\n" + text)
+    
+    def _build_command_table(self) -> Dict[str, Callable[[], str]]:
+        """特別コマンドの別名 → 返信文生成関数の表を作る"""
+        entries = (
+            # AIを停止 (実際にはフラグ制御や外部プロセス操作など)
+            (_STOP_CMDS, lambda: _STOP_REPLY),
+            (_START_CMDS, lambda: _START_REPLY),
+            (_STATUS_CMDS, lambda: _STATUS_REPLY),
+            (_HEALTH_CMDS, lambda: _HEALTH_REPLY),
+            (_LOGBOOK_CMDS, lambda: _LOGBOOK_REPLY),
+            (_VERSION_CMDS, self._version_reply),
+        )
+        return {alias: handler for aliases, handler in entries for alias in aliases}
+    
+    def _version_reply(self) -> str:
+        """バージョン情報の返答"""
+        return f"📊 現在のシステムバージョン:\n{get_full_version_string()}"
+    
+    def _sweep_pending_confirmations(self):
+        """期限切れの課金確認を先頭から破棄（呼び出し側で _pending_lock を取ること）"""
+        now = time.monotonic()
+        pending = self.pending_confirmations
+        while pending:
+            first = next(iter(pending))
+            if pending[first].expires > now:
+                break
+            del pending[first]
     
     def _save_confirmation_result(self, confirmation_id: str, response: str):
         """
@@ -461,14 +793,13 @@ API使用料が閾値に達しました
             response: 応答（許可/拒否）
         """
         result_file = f"/home/pi/autonomous_ai_BCNOFNe_system/billing/confirmations/{confirmation_id}.json"
-        os.makedirs(os.path.dirname(result_file), exist_ok=True)
+        self._ensure_dir(os.path.dirname(result_file))
         
-        with open(result_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "confirmation_id": confirmation_id,
-                "response": response,
-                "timestamp": datetime.now().isoformat()
-            }, f, ensure_ascii=False, indent=2)
+        _atomic_write(result_file, json_dumps({
+            "confirmation_id": confirmation_id,
+            "response": response,
+            "timestamp": datetime.now().isoformat()
+        }))
     
     def _classify_input(self, text: str) -> str:
         """
@@ -480,69 +811,118 @@ API使用料が閾値に達しました
         Returns:
             "query" or "goal"
         """
-        # 質問パターン（正規表現）
-        query_patterns = [
-            r'[?？]',                    # 疑問符
-            r'(教えて|おしえて)',         # 教えて系
-            r'(天気|気温|温度)',          # 天気系
-            r'^(何|なに|なん)',           # 何〜
-            r'^(いつ|どこ|誰|だれ)',     # 疑問詞
-            r'(調べて|しらべて)',         # 調べて系
-            r'(どう|どんな|どれ)',       # どう系
-            r'(ある|ない|できる)\s*[?？]',  # 可否質問
-            r'(とは|って何|ってなに)',   # 定義質問
-            r'(意味|違い)',              # 意味・違い
-            r'(わかる|知って|しって)',   # 知識確認
-        ]
-        
         text_stripped = text.strip()
         
-        for pattern in query_patterns:
-            if re.search(pattern, text_stripped):
-                return "query"
+        if _QUERY_RE.search(text_stripped):
+            return "query"
         
         # 短いテキスト（10文字以下）で命令形でなければ質問扱い
-        if len(text_stripped) <= 10 and not re.search(r'(して|しろ|せよ|する)$', text_stripped):
+        if len(text_stripped) <= 10 and not _IMPERATIVE_TAIL_RE.search(text_stripped):
             return "query"
         
         return "goal"
     
-    def _save_event(self, event_type: str, text: str, user_id: str):
+    def _save_event(self, event_type: str, text: str, user_id: str, inbox: bool = True):
         """
         イベントをインボックスと履歴に保存
         
         Args:
-            event_type: "query" or "goal"
+            event_type: "query" / "goal" / "ignored"
             text: テキスト
             user_id: ユーザーID
+            inbox: False なら履歴にだけ残す
         """
+        now = datetime.now()
         event_data = {
             "type": event_type,
             "text": text,
             "user_id": user_id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat(),
+            "event_id": self._next_event_id()
         }
+        # インボックスと履歴は同じ1行（シリアライズは1回だけ）
+        line = json_dumps(event_data, newline=True)
         
         # 1) インボックスに追記（未処理キュー）
-        inbox_file = "/home/pi/autonomous_ai_BCNOFNe_system/commands/inbox.jsonl"
-        os.makedirs(os.path.dirname(inbox_file), exist_ok=True)
-        
-        with open(inbox_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(event_data, ensure_ascii=False) + "\n")
+        if inbox:
+            self._append_inbox(line)
         
-        # 2) 永続履歴に保存
-        today = datetime.now().strftime("%Y%m%d")
-        history_dir = f"/home/pi/autonomous_ai_BCNOFNe_system/commands/history/{today}"
-        os.makedirs(history_dir, exist_ok=True)
-        
-        event_id = str(uuid.uuid4())
-        history_file = os.path.join(history_dir, f"{event_id}.json")
+        # 2) 永続履歴に保存（書き込みスレッドへ。キューが溢れていたらここで書く）
+        today = now.strftime("%Y%m%d")
+        self._ensure_history_writer()
+        try:
+            self._history_q.put_nowait((today, line))
+        except queue.Full:
+            self._write_history(today, line)
+    
+    def _next_event_id(self) -> str:
+        """
+        時刻順に並ぶイベントIDを発行（uuid4 の乱数取得を避ける）
         
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                **event_data,
-                "event_id": event_id
-            }, f, ensure_ascii=False, indent=2)
+        ナノ秒時刻 + PID（gunicornワーカー間の衝突防止）+ 連番
+        """
+        return f"{time.time_ns():016x}-{os.getpid():x}-{next(self._event_seq) & 0xFFFF:04x}"
+    
+    def _write_history(self, today: str, line: bytes):
+        """当日の history/YYYYMMDD/events.jsonl に1行追記（日付が変わったら開き直す）"""
+        with self._history_lock:
+            if today != self._history_fp_day:
+                self._close_history_fp()
+                history_dir = os.path.join(self.COMMAND_HISTORY_DIR, today)
+                self._ensure_dir(history_dir)
+                self._history_fp = open(os.path.join(history_dir, self.HISTORY_EVENTS_FILE), 'ab', buffering=0)
+                self._history_fp_day = today
+            self._history_fp.write(line)
+    
+    def _close_history_fp(self):
+        if self._history_fp is not None:
+            self._history_fp.close()
+            self._history_fp = None
+            self._history_fp_day = None
+    
+    def _ensure_history_writer(self):
+        """履歴書き込みスレッドを必要時に起動"""
+        with self._outbox_lock:
+            if self._history_thread is None or not self._history_thread.is_alive():
+                self._history_thread = threading.Thread(
+                    target=self._history_writer, name="line-history", daemon=True
+                )
+                self._history_thread.start()
+    
+    def _history_writer(self):
+        """キューに積まれた履歴を順に書き出す"""
+        while True:
+            item = self._history_q.get()
+            if item is None:
+                return
+            try:
+                self._write_history(*item)
+            except Exception as e:
+                self.logger.error(f"コマンド履歴保存エラー: {e}")
+    
+    def _ensure_dir(self, path: str):
+        """ディレクトリを作成（このプロセスで作成済みなら何もしない）"""
+        if path not in self._dirs_ensured:
+            os.makedirs(path, exist_ok=True)
+            self._dirs_ensured.add(path)
+    
+    def _append_inbox(self, line: bytes):
+        """インボックスに1行追記（読み取り側に退避・削除されていたら開き直す）"""
+        with self._inbox_lock:
+            fp = self._inbox_fp
+            if fp is not None:
+                try:
+                    moved = os.stat(self.INBOX_FILE).st_ino != os.fstat(fp.fileno()).st_ino
+                except FileNotFoundError:
+                    moved = True
+                if moved:
+                    fp.close()
+                    fp = None
+            if fp is None:
+                self._ensure_dir(os.path.dirname(self.INBOX_FILE))
+                fp = open(self.INBOX_FILE, 'ab', buffering=0)
+                self._inbox_fp = fp
+            fp.write(line)
     
     def _save_user_command(self, command: str, user_id: str):
         """
@@ -555,91 +935,6 @@ API使用料が閾値に達しました
         # 新しいイベント方式で保存
         self._save_event("goal", command, user_id)
         
-    def _send_audio_cmd(self, action: str, params: dict):
-        """AudioManagerに音声コマンドを送信"""
-        try:
-            import time
-            cmd = {
-                "action": action,
-                "params": params,
-                "timestamp": str(time.time()),
-                "source": "line"
-            }
-            with open("/tmp/shipos_audio_cmd.json", "w", encoding="utf-8") as f:
-                json.dump(cmd, f, ensure_ascii=False)
-        except Exception as e:
-            print(f"音声コマンド送信エラー: {e}")
-    
-    def _stop_ai_service(self) -> str:
-        """
-        AIエージェントサービスを停止
-        
-        Returns:
-            結果メッセージ
-        """
-        try:
-            result = subprocess.run(
-                ["sudo", "systemctl", "stop", "autonomous-ai.service"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                return "⏹️ AIエージェントを停止しました\n\n再開するには「再開」と送信してください。"
-            else:
-                return f"⚠️ 停止に失敗しました\n\nエラー: {result.stderr}"
-        except Exception as e:
-            return f"❌ エラーが発生しました: {str(e)}"
-    
-    def _start_ai_service(self) -> str:
-        """
-        AIエージェントサービスを起動
-        
-        Returns:
-            結果メッセージ
-        """
-        try:
-            result = subprocess.run(
-                ["sudo", "systemctl", "start", "autonomous-ai.service"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                return "🚀 AIエージェントを起動しました\n\n数秒後に動作を開始します。"
-            else:
-                return f"⚠️ 起動に失敗しました\n\nエラー: {result.stderr}"
-        except Exception as e:
-            return f"❌ エラーが発生しました: {str(e)}"
-    
-    def _check_ai_service_status(self) -> str:
-        """
-        AIエージェントサービスの状態を確認
-        
-        Returns:
-            状態メッセージ
-        """
-        try:
-            result = subprocess.run(
-                ["systemctl", "is-active", "autonomous-ai.service"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            status = result.stdout.strip()
-            
-            if status == "active":
-                return "✅ AIエージェント: 稼働中\n\n停止するには「停止」と送信してください。"
-            elif status == "inactive":
-                return "⏹️ AIエージェント: 停止中\n\n起動するには「再開」と送信してください。"
-            else:
-                return f"⚠️ AIエージェント: {status}\n\n詳細はログを確認してください。"
-        except Exception as e:
-            return f"❌ 状態確認エラー: {str(e)}"
-    
     def run_webhook_server(self, host: str = "0.0.0.0", port: int = 5000):
         """
         Webhookサーバーを起動
@@ -649,126 +944,7 @@ API使用料が閾値に達しました
             port: ポート
         """
         app = self.create_webhook_app()
-        app.run(host=host, port=port)
-    
-    # === shipOS 連携メソッド ===
-    
-    SHIP_MODE_FILE = "/home/pi/autonomous_ai_BCNOFNe_system/state/ship_mode.json"
-    MODE_HISTORY_FILE = "/home/pi/autonomous_ai_BCNOFNe_system/state/mode_history.jsonl"
-    HEALTH_HISTORY_FILE = "/home/pi/autonomous_ai_BCNOFNe_system/state/health_history.jsonl"
-    SHIPS_LOG_DIR = "/home/pi/autonomous_ai_BCNOFNe_system/state/ships_log"
-    
-    def _read_current_mode(self) -> dict:
-        """現在のモード状態を読み取り"""
-        try:
-            if os.path.exists(self.SHIP_MODE_FILE):
-                with open(self.SHIP_MODE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return {"mode": "autonomous", "since": "", "override": False}
-    
-    def _switch_ship_mode(self, mode: str, reason: str = "") -> str:
-        """モードを切り替えて結果メッセージを返す"""
-        import os
-        mode_names = {
-            "autonomous": "⛵ 自律航海", "user_first": "🏠 入港待機",
-            "maintenance": "🔧 ドック入り", "power_save": "🌙 停泊", "safe": "🆘 救難信号"
-        }
-        try:
-            old_data = self._read_current_mode()
-            old_mode = old_data.get("mode", "autonomous")
-            
-            new_state = {
-                "mode": mode,
-                "since": datetime.now().isoformat(),
-                "override": True,
-                "override_until": None,
-                "updated": datetime.now().isoformat()
-            }
-            os.makedirs(os.path.dirname(self.SHIP_MODE_FILE), exist_ok=True)
-            with open(self.SHIP_MODE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(new_state, f, ensure_ascii=False, indent=2)
-            
-            # 履歴記録
-            try:
-                with open(self.MODE_HISTORY_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({
-                        "from": old_mode, "to": mode, "reason": reason,
-                        "source": "line", "timestamp": datetime.now().isoformat()
-                    }, ensure_ascii=False) + "\n")
-            except Exception:
-                pass
-            
-            old_name = mode_names.get(old_mode, old_mode)
-            new_name = mode_names.get(mode, mode)
-            return f"🔄 モード切替完了\n{old_name} → {new_name}\n理由: {reason}"
-        except Exception as e:
-            return f"❌ モード切替失敗: {e}"
-    
-    def _get_health_summary(self) -> str:
-        """最新ヘルスチェック結果をテキストで返す"""
-        try:
-            if os.path.exists(self.HEALTH_HISTORY_FILE):
-                with open(self.HEALTH_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                if lines:
-                    h = json.loads(lines[-1].strip())
-                    ts = h.get("timestamp", "")[:19]
-                    result = [f"🏥 ヘルス状態 ({ts})"]
-                    for c in h.get("checks", []):
-                        icon = {"OK": "🟢", "WARN": "🟡", "CRITICAL": "🔴"}.get(c.get("status", ""), "⚪")
-                        result.append(f"{icon} {c.get('name', '')}: {c.get('message', '')}")
-                    return "\n".join(result)
-        except Exception as e:
-            return f"❌ ヘルス取得エラー: {e}"
-        return "ヘルスデータなし"
-    
-    def _get_daily_log(self) -> str:
-        """今日の航海日誌サマリーを返す"""
-        try:
-            today_file = os.path.join(
-                self.SHIPS_LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl"
-            )
-            if os.path.exists(today_file):
-                with open(today_file, 'r', encoding='utf-8') as f:
-                    entries = [json.loads(l.strip()) for l in f if l.strip()]
-                if entries:
-                    total = len(entries)
-                    success = sum(1 for e in entries if e.get("success", True))
-                    rate = round(success / total * 100, 1) if total else 0
-                    return (
-                        f"📔 航海日誌 {datetime.now().strftime('%Y/%m/%d')}\n"
-                        f"行動回数: {total}回\n"
-                        f"成功率: {rate}%\n"
-                        f"最新: {entries[-1].get('type', '')}: {entries[-1].get('detail', '')[:40]}"
-                    )
-        except Exception as e:
-            return f"❌ 航海日誌エラー: {e}"
-        return "本日のエントリなし"
-    
-    def _what_did_i_do(self) -> str:
-        """「今日なにした？」への回答"""
-        try:
-            today_file = os.path.join(
-                self.SHIPS_LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.jsonl"
-            )
-            if os.path.exists(today_file):
-                with open(today_file, 'r', encoding='utf-8') as f:
-                    entries = [json.loads(l.strip()) for l in f if l.strip()]
-                if entries:
-                    total = len(entries)
-                    success = sum(1 for e in entries if e.get("success", True))
-                    rate = round(success / total * 100, 1) if total else 0
-                    recent = entries[-3:]
-                    recent_str = "、".join(e.get("detail", "")[:20] for e in recent)
-                    return (
-                        f"今日は{total}回動いたよ！成功率は{rate}%。\n"
-                        f"最近: {recent_str}"
-                    )
-        except Exception:
-            pass
-        return "今日はまだ何もしてないよ。のんびり航海中〜"
+        app.run(host=host, port=port, threaded=True)
 
 
 # Gunicorn用
@@ -783,5 +959,5 @@ if __name__ == "__main__":
     print("ポート: 5000")
     print("Ctrl+Cで停止")
     
-    # 直接起動時は Flask の開発サーバーを使用
-    app.run(host="0.0.0.0", port=5000)
+    # 直接起動時は Flask の開発サーバーを使用（本番は systemd の gunicorn gthread）
+    app.run(host="0.0.0.0", port=5000, threaded=True)
@@ -12,6 +12,7 @@ import os
 import sys
 import time
 import signal
+import socket
 import json
 import threading
 from datetime import datetime
@@ -72,6 +73,12 @@ try:
 except ImportError:
     OLED_ENABLED = False
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
 # ロガー設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -79,6 +86,28 @@ logger = logging.getLogger(__name__)
 class IntegratedSystem:
     """統合システムクラス"""
     
+    # BillingGuard のアラートレベル → 通知文の表記
+    COST_ALERT_LEVELS = {"stop": "停止", "alert": "警告", "warning": "注意"}
+    # LINE にも送るレベル（注意はDiscordのみ）
+    COST_ALERT_LINE_LEVELS = frozenset({"stop", "alert"})
+    
+    # 通知の間隔（イテレーション数）
+    EXECUTION_LOG_EVERY = 10
+    MEMORY_SUMMARY_EVERY = 50
+    
+    # コマンドを実行したイテレーションの後は短い間隔で続ける（API消費を抑えるため連続回数に上限）
+    FOLLOWUP_INTERVAL = 5
+    MAX_FOLLOWUP_ITERATIONS = 3
+    
+    COMMANDS_DIR = "/home/pi/autonomous_ai_BCNOFNe_system/commands"
+    COMMAND_FILES = frozenset({"inbox.jsonl", "user_commands.jsonl"})
+    # コマンドファイルの読み込み位置（再起動しても処理済みの行を読み直さないよう保存する）
+    COMMAND_OFFSETS_FILE = os.path.join(COMMANDS_DIR, "read_offsets.json")
+    # 読み切った位置がこれを超えたら .old へ退避して新しいファイルに切り替える
+    COMMAND_COMPACT_BYTES = 1024 * 1024
+    # 退避したファイルに、開きっぱなしの書き手が書いた分を拾い続ける秒数
+    COMMAND_ROTATE_GRACE = 60
+    
     def __init__(self):
         """初期化"""
         print("システムを初期化中...")
@@ -111,6 +140,9 @@ class IntegratedSystem:
             data_dir="/home/pi/autonomous_ai_BCNOFNe_system/billing"
         )
         
+        # 起動通知の重複防止フラグ
+        self.startup_flag = StartupFlag("/home/pi/autonomous_ai_BCNOFNe_system/.startup_flag")
+        
         # Quick Responder（質問即時回答用）
         self.quick_responder = QuickResponder(
             api_key=os.getenv("OPENAI_API_KEY")
@@ -166,11 +198,78 @@ class IntegratedSystem:
 
         self.running = True
         self.start_time = datetime.now()
+        
+        # コマンド到着（inotify）またはシャットダウンで待機を打ち切るためのイベント
+        self._wake = threading.Event()
+        self._inotify = None
+        self._start_command_watch()
+        # コマンドファイル毎の (inode, 読み込み済みバイト位置)。前回終了時の位置から再開する
+        self._cmd_offsets: dict = self._load_command_offsets()
+        self._cmd_offsets_saved = dict(self._cmd_offsets)
+        self._cmd_rotated: dict = {}  # 退避したコマンドファイル → 退避時刻（monotonic）
+        self._audio_sock: Optional[socket.socket] = None  # AudioManager 宛ての送信用ソケット
+        
+        # 定期メンテナンスのディスク処理は別スレッドで走らせる（その間もコマンド処理を止めない）
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._maintenance_result: Optional[dict] = None
+        self._storage_lock = threading.Lock()
+        # 次に実行ログ / メモリサマリーを送るイテレーション番号
+        self._next_execution_log_at = self.EXECUTION_LOG_EVERY
+        self._next_memory_summary_at = self.MEMORY_SUMMARY_EVERY
     
     def handle_shutdown(self, signum, frame):
         """シャットダウンハンドラ"""
         print("\n" + self.narrator.narrate("shutdown"))
         self.running = False
+        self._wake.set()
+    
+    def _start_command_watch(self):
+        """commands/ を inotify で監視するスレッドを起動（無ければ従来どおり周期処理のみ）"""
+        if not INOTIFY_AVAILABLE:
+            return
+        try:
+            os.makedirs(self.COMMANDS_DIR, exist_ok=True)
+            inotify = INotify()
+            # LINE Bot は開きっぱなしのfdに追記するので MODIFY も見る
+            inotify.add_watch(
+                self.COMMANDS_DIR,
+                inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+            )
+            self._inotify = inotify
+        except Exception as e:
+            print(f"inotify初期化失敗、周期処理のみで継続: {e}")
+            return
+        threading.Thread(target=self._command_watch_worker, daemon=True).start()
+    
+    def _command_watch_worker(self):
+        """インボックスへの書き込みを検知したらメインループの待機を起こす"""
+        inotify = self._inotify
+        try:
+            while self.running:
+                events = inotify.read(timeout=1000)
+                if any(evt.name in self.COMMAND_FILES for evt in events):
+                    self._wake.set()
+        except Exception as e:
+            print(f"コマンド監視エラー、周期処理のみで継続: {e}")
+        finally:
+            inotify.close()
+    
+    def _wait_next_iteration(self, seconds: float):
+        """
+        次のイテレーションまで待機
+        
+        待機中にコマンドが届いたらその場でインボックスを処理する（次の周期を待たない）。
+        シャットダウン時はすぐ戻る。
+        """
+        deadline = time.monotonic() + seconds
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._wake.wait(remaining):
+                self._wake.clear()
+                if self.running:
+                    self.process_inbox()
     
     def _register_periodic_tasks(self):
         """定期タスクをスケジューラに登録"""
@@ -180,7 +279,7 @@ class IntegratedSystem:
         # HDD整理: 毎日1回（自律モード時のみ）
         self.scheduler.register(
             "HDD整理", 
-            lambda: self.storage.archive_old_files(dry_run=False),
+            lambda: self._archive_old_files(dry_run=False),
             interval_sec=86400,
             run_in_modes=["autonomous", "maintenance"]
         )
@@ -190,7 +289,7 @@ class IntegratedSystem:
             import psutil
             usage = psutil.disk_usage("/")
             if usage.percent >= 80:
-                result = self.storage.archive_old_files(dry_run=False)
+                result = self._archive_old_files(dry_run=False)
                 return f"SSD{usage.percent:.0f}% → {result['moved_files']}件移動"
             return f"SSD{usage.percent:.0f}% 正常"
         
@@ -233,9 +332,7 @@ class IntegratedSystem:
     def send_startup_notifications(self):
         """起動通知を送信（重複防止付き）"""
         # 起動フラグチェック
-        startup_flag = StartupFlag("/home/pi/autonomous_ai_BCNOFNe_system/.startup_flag")
-        
-        if not startup_flag.should_send_startup_notification(cooldown_minutes=5):
+        if not self.startup_flag.should_send_startup_notification(cooldown_minutes=5):
             print("起動通知は最近5分以内に送信済みです。スキップします。")
             return
         
@@ -270,65 +367,158 @@ class IntegratedSystem:
         - 後方互換: user_commands.jsonl もサポート
         """
         # === 新形式: inbox.jsonl ===
-        inbox_file = "/home/pi/autonomous_ai_BCNOFNe_system/commands/inbox.jsonl"
+        inbox_file = os.path.join(self.COMMANDS_DIR, "inbox.jsonl")
         
-        if os.path.exists(inbox_file):
-            try:
-                with open(inbox_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+        try:
+            for line in self._read_new_command_lines(inbox_file):
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                try:
+                    self._handle_event(event)
+                except Exception as e:
+                    # 1件の失敗で残りのイベントを捨てない
+                    self.agent.log(f"イベント処理エラー: {e}", "ERROR")
                 
-                if lines:
-                    for line in lines:
-                        try:
-                            event = json.loads(line.strip())
-                            self._handle_event(event)
-                        except json.JSONDecodeError:
-                            continue
-                    
-                    # 処理済みのインボックスを削除（履歴は残る）
-                    os.remove(inbox_file)
-                    
-            except Exception as e:
-                self.agent.log(f"インボックス処理エラー: {e}", "ERROR")
+        except Exception as e:
+            self.agent.log(f"インボックス処理エラー: {e}", "ERROR")
         
         # === 後方互換: user_commands.jsonl ===
-        legacy_file = "/home/pi/autonomous_ai_BCNOFNe_system/commands/user_commands.jsonl"
+        legacy_file = os.path.join(self.COMMANDS_DIR, "user_commands.jsonl")
         
-        if os.path.exists(legacy_file):
-            try:
-                with open(legacy_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+        try:
+            lines = self._read_new_command_lines(legacy_file)
+            
+            if lines:
+                last_command = json.loads(lines[-1])
+                command_text = last_command.get("command", "")
                 
-                if lines:
-                    last_command = json.loads(lines[-1])
-                    command_text = last_command.get("command", "")
-                    
-                    if command_text:
-                        # 旧形式は全てgoal扱い
-                        self.agent.update_goal(command_text, source="user")
-                        self.agent.log(f"レガシーコマンドを受信: {command_text}", "INFO")
-                        self.line.send_status(f"✅ 目標を設定しました:\n{command_text}")
-                        self.discord.send_message(f"📨 LINEから新しい目標を受信:\n{command_text}")
-                    
-                    os.remove(legacy_file)
-                    
-            except Exception as e:
-                self.agent.log(f"レガシーコマンド読み取りエラー: {e}", "ERROR")
+                if command_text:
+                    # 旧形式は全てgoal扱い
+                    self.agent.update_goal(command_text, source="user")
+                    self.agent.log(f"レガシーコマンドを受信: {command_text}", "INFO")
+                    self.line.send_status(f"✅ 目標を設定しました:\n{command_text}")
+                    self.discord.send_message(f"📨 LINEから新しい目標を受信:\n{command_text}")
+                
+        except Exception as e:
+            self.agent.log(f"レガシーコマンド読み取りエラー: {e}", "ERROR")
+        
+        # 処理し終えた位置を保存し、大きくなったファイルは退避する
+        try:
+            for path in (inbox_file, legacy_file):
+                self._compact_command_file(path)
+            self._save_command_offsets()
+        except Exception as e:
+            self.agent.log(f"コマンド読み込み位置の保存エラー: {e}", "ERROR")
+    
+    def _read_new_command_lines(self, path: str) -> list:
+        """
+        コマンドファイルに前回以降追記された完全な行（bytes）を返す
+        
+        ファイルは空にも削除もしない（書き手が同時に追記しても行を失わない）。
+        退避直後は .old 側に書かれた分も先に返す。
+        """
+        lines = []
+        rotated_at = self._cmd_rotated.get(path)
+        if rotated_at is not None:
+            old = path + ".old"
+            old_lines = self._read_appended_lines(old)
+            lines.extend(old_lines)
+            if not old_lines and time.monotonic() - rotated_at > self.COMMAND_ROTATE_GRACE:
+                del self._cmd_rotated[path]
+                self._cmd_offsets.pop(old, None)
+        lines.extend(self._read_appended_lines(path))
+        return lines
+    
+    def _read_appended_lines(self, path: str) -> list:
+        """
+        前回の読み込み位置以降の完全な行を返す
+        
+        サイズが前回の読み込み位置と同じなら open せずに戻る。
+        書きかけの最終行は次回に回す。
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return []
+        inode, offset = self._cmd_offsets.get(path, (None, 0))
+        if st.st_ino != inode or st.st_size < offset:
+            offset = 0  # 作り直された or 外部で空にされた
+        if st.st_size == offset:
+            self._cmd_offsets[path] = (st.st_ino, offset)
+            return []
+        
+        # バッファ無しで開き、前回位置からの差分を pread 1回で取る（seek 不要）
+        with open(path, 'rb', buffering=0) as f:
+            data = os.pread(f.fileno(), os.fstat(f.fileno()).st_size - offset, offset)
+            end = data.rfind(b"\n") + 1
+            offset += end
+        self._cmd_offsets[path] = (st.st_ino, offset)
+        return data[:end].splitlines()
+    
+    def _compact_command_file(self, path: str):
+        """
+        読み切っていて位置が COMMAND_COMPACT_BYTES を超えていれば .old へ退避する
+        
+        truncate ではなく rename なので、直前に書き手が追記した行は .old に残り、
+        _read_new_command_lines が猶予期間のあいだ拾う。書き手は次の書き込みで新しいファイルを開き直す。
+        """
+        inode, offset = self._cmd_offsets.get(path, (None, 0))
+        if offset < self.COMMAND_COMPACT_BYTES:
+            return
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != inode or st.st_size != offset:
+            return  # 未読の行がある → 次回
+        old = path + ".old"
+        os.replace(path, old)
+        self._cmd_offsets[old] = (inode, offset)
+        self._cmd_offsets.pop(path, None)
+        self._cmd_rotated[path] = time.monotonic()
+    
+    def _load_command_offsets(self) -> dict:
+        """保存しておいた読み込み位置を読む（無い・壊れていれば先頭から読む）"""
+        try:
+            with open(self.COMMAND_OFFSETS_FILE, 'r', encoding='utf-8') as f:
+                return {path: tuple(pos) for path, pos in json.load(f).items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+    
+    def _save_command_offsets(self):
+        """読み込み位置が変わっていれば保存する（書きかけを残さないよう差し替えで書く）"""
+        if self._cmd_offsets == self._cmd_offsets_saved:
+            return
+        tmp = self.COMMAND_OFFSETS_FILE + ".new"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._cmd_offsets, f)
+        os.replace(tmp, self.COMMAND_OFFSETS_FILE)
+        self._cmd_offsets_saved = dict(self._cmd_offsets)
     
+    AUDIO_CMD_SOCK = "/tmp/shipos_audio.sock"
     AUDIO_CMD_FILE = "/tmp/shipos_audio_cmd.json"
     
     def _send_audio_cmd(self, action: str, params: dict):
-        """AudioManagerに音声コマンドを送信（ファイルベースIPC）"""
+        """AudioManagerに音声コマンドを送信（Unix DGRAM ソケット、届かなければファイルベースIPC）"""
         try:
-            import json as _json
-            cmd = {
+            data = json.dumps({
                 "action": action,
                 "params": params,
                 "timestamp": datetime.now().isoformat(),
                 "source": "main"
-            }
-            with open(self.AUDIO_CMD_FILE, 'w', encoding='utf-8') as f:
-                _json.dump(cmd, f, ensure_ascii=False)
+            }, ensure_ascii=False).encode("utf-8")
+            try:
+                if self._audio_sock is None:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                    sock.setblocking(False)
+                    self._audio_sock = sock
+                self._audio_sock.sendto(data, self.AUDIO_CMD_SOCK)
+            except OSError:
+                # AudioManager 未起動・旧版 → 従来のファイル経由
+                with open(self.AUDIO_CMD_FILE, 'wb') as f:
+                    f.write(data)
             self.agent.log(f"音声コマンド送信完了: {action}", "DEBUG")
         except Exception as e:
             self.agent.log(f"音声コマンド送信エラー: {e}", "ERROR")
@@ -365,7 +555,7 @@ class IntegratedSystem:
             dry_run = "dry" in text
             if not is_voice:
                 self.line.send_message(f"[CLEAN] 整理を開始するばい... (dry_run={dry_run})")
-            result = self.storage.archive_old_files(dry_run=dry_run)
+            result = self._archive_old_files(dry_run=dry_run)
             msg = f"[OK] 整理完了！\n移動: {result['moved_files']}件\n解放サイズ: {result['total_size']//1024//1024}MB"
             if not is_voice:
                 self.line.send_message(msg)
@@ -410,6 +600,16 @@ class IntegratedSystem:
             except Exception:
                 pass
     
+    def _broadcast_cost_alert(self, alert: dict):
+        """コストアラートをDiscordへ、停止・警告はLINEにも送る（どちらも送信キューに積むだけ）"""
+        level = alert["level"]
+        level_jp = self.COST_ALERT_LEVELS.get(level)
+        if level_jp is None:
+            return
+        self.discord.send_cost_alert(alert["today_cost"], alert["threshold"], level_jp)
+        if level in self.COST_ALERT_LINE_LEVELS:
+            self.line.send_cost_alert(alert["today_cost"], alert["threshold"], level_jp)
+    
     def run_iteration_with_monitoring(self) -> bool:
         """
         監視付きイテレーション実行
@@ -425,45 +625,13 @@ class IntegratedSystem:
             alert = self.billing.check_threshold()
             
             if alert:
+                self._broadcast_cost_alert(alert)
+                
                 if alert["level"] == "stop":
                     # 自動停止
-                    self.discord.send_cost_alert(
-                        alert["today_cost"],
-                        alert["threshold"],
-                        "停止"
-                    )
-                    # 重大エラー → LINEにも送信
-                    self.line.send_cost_alert(
-                        alert["today_cost"],
-                        alert["threshold"],
-                        "停止"
-                    )
-                    
                     self.agent.log("コスト上限に達したため停止します", "ERROR")
                     self.running = False
                     return False
-                
-                elif alert["level"] == "alert":
-                    # 警告通知
-                    self.discord.send_cost_alert(
-                        alert["today_cost"],
-                        alert["threshold"],
-                        "警告"
-                    )
-                    # 重大 → LINEにも送信
-                    self.line.send_cost_alert(
-                        alert["today_cost"],
-                        alert["threshold"],
-                        "警告"
-                    )
-                
-                elif alert["level"] == "warning":
-                    # 注意通知（Discordのみ）
-                    self.discord.send_cost_alert(
-                        alert["today_cost"],
-                        alert["threshold"],
-                        "注意"
-                    )
             
             # 思考中通知用タイマー（15秒以上かかる場合にLINE送信）
             thinking_timer = None
@@ -489,10 +657,12 @@ class IntegratedSystem:
                 )
                 
                 # Discord通知（従来通り10回に1回）
-                if self.agent.iteration_count % 10 == 0:
-                    commands = self.agent.last_commands if hasattr(self.agent, 'last_commands') else []
-                    results = self.agent.last_results if hasattr(self.agent, 'last_results') else []
-                    thinking = self.agent.last_thinking if hasattr(self.agent, 'last_thinking') else ""
+                if self.agent.iteration_count >= self._next_execution_log_at:
+                    self._next_execution_log_at = self.agent.iteration_count + self.EXECUTION_LOG_EVERY
+                    # AutonomousAgent.__init__ で必ず初期化されている
+                    commands = self.agent.last_commands
+                    results = self.agent.last_results
+                    thinking = self.agent.last_thinking
                     
                     # Discordは常に詳細ログを送信
                     self.discord.send_execution_log(
@@ -515,24 +685,78 @@ class IntegratedSystem:
             return success
             
         except Exception as e:
-            self.agent.log(f"イテレーション実行エラー: {e}", "ERROR")
+            msg = str(e)
+            self.agent.log(f"イテレーション実行エラー: {msg}", "ERROR")
             
             # エラー通知（Discordは常に）
-            self.discord.send_error_notification(str(e))
+            self.discord.send_error_notification(msg)
             
             # 重大エラーのみLINEに通知
-            self.line.send_error_notification(str(e))
+            self.line.send_error_notification(msg)
             
             return False
     
-    def run_maintenance(self):
-        """定期メンテナンス"""
+    def _archive_old_files(self, dry_run: bool = False) -> dict:
+        """HDDアーカイブ（メンテナンス・スケジューラ・/cleanup が同時に走らないよう直列化）"""
+        with self._storage_lock:
+            return self.storage.archive_old_files(dry_run=dry_run)
+    
+    def _start_maintenance(self):
+        """定期メンテナンスを開始（ディスク処理だけバックグラウンドへ。前回分が終わっていなければ見送る）"""
+        if self._maintenance_thread is not None:
+            self.agent.log("前回のメンテナンスが実行中のためスキップします", "WARNING")
+            return
         print("定期メンテナンスを実行中...")
         if LINE_MAINTENANCE_NOTIFY:
             self.line.send_status("🔧 定期メンテナンス実行中...")
+        self._maintenance_result = None
+        self._maintenance_thread = threading.Thread(
+            target=self._maintenance_worker, name="maintenance", daemon=True
+        )
+        self._maintenance_thread.start()
+    
+    def _maintenance_worker(self):
+        """
+        ストレージ監視・アーカイブ・一時ファイル削除（バックグラウンドスレッド）
+        
+        エージェント・メモリ・通知には触らず、結果を _maintenance_result に置くだけ。
+        記録と通知は _finish_maintenance がメインループで行う。
+        """
+        try:
+            self._maintenance_result = self._run_storage_maintenance()
+        except Exception as e:
+            self._maintenance_result = {"error": str(e)}
+    
+    def _finish_maintenance(self):
+        """バックグラウンドのディスク処理が終わっていれば、結果の記録・通知をメインループで行う"""
+        thread = self._maintenance_thread
+        if thread is None or thread.is_alive():
+            return
+        self._maintenance_thread = None
+        result = self._maintenance_result or {}
+        self._maintenance_result = None
+        if "error" in result:
+            self.agent.log(f"メンテナンスエラー: {result['error']}", "ERROR")
+            self.discord.send_error_notification(result["error"])
+            return
+        self._report_maintenance(result)
+    
+    def _run_storage_maintenance(self) -> dict:
+        """定期メンテナンスのディスク処理部分（結果を dict で返す）"""
+        result = {"alert": None, "archive": None, "deleted": 0}
+        
+        # ストレージチェック → 逼迫していれば自動アーカイブ
+        result["alert"] = self.storage.monitor_storage(threshold_percent=80.0)
+        if result["alert"]:
+            result["archive"] = self._archive_old_files(dry_run=False)
         
-        # ストレージチェック
-        alert = self.storage.monitor_storage(threshold_percent=80.0)
+        # 一時ファイル削除
+        result["deleted"] = self.storage.cleanup_temp_files()
+        return result
+    
+    def _report_maintenance(self, maintenance: dict):
+        """メンテナンス結果の記録・通知とメモリサマリー送信（メインループから呼ぶ）"""
+        alert = maintenance.get("alert")
         if alert:
             self.agent.log(alert["message"], "WARNING")
             self.discord.send_message(f"⚠️ {alert['message']}")
@@ -540,8 +764,8 @@ class IntegratedSystem:
             self.line.send_status(f"⚠️ {alert['message']}")
             
             # 自動アーカイブ
-            result = self.storage.archive_old_files(dry_run=False)
-            if result["moved_files"] > 0:
+            result = maintenance.get("archive")
+            if result and result["moved_files"] > 0:
                 msg = f"古いファイルを{result['moved_files']}個アーカイブしました"
                 self.agent.log(msg, "INFO")
                 # Discordには詳細
@@ -555,15 +779,15 @@ class IntegratedSystem:
                 # LINEには短いサマリー
                 self.line.send_status(f"📦 {msg}")
         
-        # 一時ファイル削除
-        deleted = self.storage.cleanup_temp_files()
+        deleted = maintenance.get("deleted", 0)
         if deleted > 0:
             self.agent.log(f"一時ファイルを{deleted}個削除しました", "INFO")
         
-        # メモリサマリー送信（Discordのみ）
-        if self.agent.iteration_count % 50 == 0:
+        # メモリサマリー送信（Discordのみ）。送れてから次の送信位置を進める
+        if self.agent.iteration_count >= self._next_memory_summary_at:
             summary = self.agent.memory.get_summary()
             self.discord.send_memory_summary(summary)
+            self._next_memory_summary_at = self.agent.iteration_count + self.MEMORY_SUMMARY_EVERY
         
         if LINE_MAINTENANCE_NOTIFY:
             self.line.send_status("✅ メンテナンス完了")
@@ -584,12 +808,14 @@ class IntegratedSystem:
         # メインループ
         iteration_interval = 30  # 秒
         maintenance_interval = 3600  # 1時間
-        last_maintenance = time.time()
+        # NTP で時計が補正されても間隔がずれないよう単調時計で期限を持つ
+        next_maintenance = time.monotonic() + maintenance_interval
+        followups = 0  # 短い間隔で続けたイテレーション数
         
         while self.running:
             try:
                 # イテレーション実行（インボックス処理も含む）
-                self.run_iteration_with_monitoring()
+                success = self.run_iteration_with_monitoring()
                 
                 # AIState更新
                 ai = get_ai_state()
@@ -625,28 +851,36 @@ class IntegratedSystem:
                     success=True
                 )
                 
-                # 定期メンテナンス
-                if time.time() - last_maintenance > maintenance_interval:
-                    self.run_maintenance()
-                    last_maintenance = time.time()
+                # 定期メンテナンス（ディスク処理はバックグラウンド、終わった分の通知はここで）
+                self._finish_maintenance()
+                if time.monotonic() >= next_maintenance:
+                    self._start_maintenance()
+                    next_maintenance = time.monotonic() + maintenance_interval
                 
                 # モード連動イテレーション間隔
                 mode_config = self.ship_mode.get_config()
                 wait_sec = mode_config.get("iteration_interval", iteration_interval)
                 
-                # 待機
-                if self.running:
-                    time.sleep(wait_sec)
+                # 作業中（コマンドを実行した）なら間隔を詰めて続ける。何もしなかったらモードの間隔に戻す
+                if success and self.agent.last_commands and followups < self.MAX_FOLLOWUP_ITERATIONS:
+                    wait_sec = min(wait_sec, self.FOLLOWUP_INTERVAL)
+                    followups += 1
+                else:
+                    followups = 0
+                
+                # 待機（届いたコマンドは待機中に処理）
+                self._wait_next_iteration(wait_sec)
                 
             except KeyboardInterrupt:
                 print("\nユーザーによる中断")
                 break
             except Exception as e:
-                self.agent.log(f"予期しないエラー: {e}", "ERROR")
-                self.discord.send_error_notification(str(e), str(e))
+                msg = str(e)
+                self.agent.log(f"予期しないエラー: {msg}", "ERROR")
+                self.discord.send_error_notification(msg, msg)
                 # 重大エラー → LINEにも通知
-                self.line.send_error_notification(str(e))
-                time.sleep(iteration_interval)
+                self.line.send_error_notification(msg)
+                self._wait_next_iteration(iteration_interval)
         
         # 停止処理
         self.shutdown()
@@ -666,6 +900,26 @@ class IntegratedSystem:
         if self.oled:
             self.oled.show_shutdown()
         
+        # コマンド監視スレッドを止める（inotify のfdはスレッド側で閉じる）
+        self.running = False
+        
+        # 実行中のメンテナンスを少し待ち、終わっていれば結果を通知キューに積む
+        if self._maintenance_thread is not None:
+            self._maintenance_thread.join(timeout=30)
+            self._finish_maintenance()
+        
+        # ヘルス履歴を閉じる
+        self.health.close()
+        
+        # LINE / Discord の送信キューを出し切る
+        self.line.close()
+        self.discord.close()
+        
+        # 音声コマンド用ソケットを閉じる
+        if self._audio_sock is not None:
+            self._audio_sock.close()
+            self._audio_sock = None
+        
         # 最終メモリ保存
         self.agent.memory.append_diary("システム停止")
         
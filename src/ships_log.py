@@ -6,13 +6,14 @@
 """
 
 import os
-import json
 import glob
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from collections import Counter
 
+from state_cache import json_dumps, json_loads
+
 
 class ShipsLog:
     """航海日誌"""
@@ -50,8 +51,8 @@ class ShipsLog:
             entry["meta"] = metadata
         
         try:
-            with open(self._today_file(), 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            with open(self._today_file(), 'ab') as f:
+                f.write(json_dumps(entry, newline=True))
         except Exception as e:
             print(f"[ShipsLog] 記録エラー: {e}")
     
@@ -65,11 +66,11 @@ class ShipsLog:
         entries = []
         try:
             if os.path.exists(path):
-                with open(path, 'r', encoding='utf-8') as f:
+                with open(path, 'rb') as f:
                     for line in f:
                         try:
-                            entries.append(json.loads(line.strip()))
-                        except json.JSONDecodeError:
+                            entries.append(json_loads(line))
+                        except ValueError:
                             continue
         except Exception:
             pass
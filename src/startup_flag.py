@@ -30,12 +30,7 @@ class StartupFlag:
         Returns:
             送信すべきならTrue
         """
-        # フラグファイルが存在しない場合は送信
-        if not os.path.exists(self.flag_file):
-            self._create_flag()
-            return True
-        
-        # フラグファイルの最終更新時刻を確認
+        # フラグファイルの最終更新時刻を確認（存在しない場合は送信）
         try:
             with open(self.flag_file, 'r') as f:
                 timestamp_str = f.read().strip()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+状態ファイル読み込みキャッシュ
+inode + mtime + ctime + size が変わった時だけ JSON をパースし直す
+
+OLEDコントローラは AI状態 / shipOSモード / LINE状態 のJSONを
+毎秒〜毎フレーム読みに行くが、実際に中身が変わるのは稀なので
+os.stat 1回で変更有無を判定してパースを省く。
+
+JSONの読み書きは orjson があればそちらを使う（json_loads / json_dumps）。
+ログ用のタイムスタンプは iso_now で秒単位にキャッシュして使い回す。
+"""
+
+import os
+import json
+import time
+from datetime import datetime, tzinfo
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+
+    def json_loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def json_dumps(obj: Any, indent: bool = False, newline: bool = False) -> bytes:
+        """UTF-8のbytesで返す（ensure_ascii=False 相当）。newline=True でJSONL用に末尾へ改行を付ける"""
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, option=option)
+
+except ImportError:
+    def json_loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def json_dumps(obj: Any, indent: bool = False, newline: bool = False) -> bytes:
+        """UTF-8のbytesで返す（ensure_ascii=False 相当）。newline=True でJSONL用に末尾へ改行を付ける"""
+        text = json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+        return (text + "\n" if newline else text).encode("utf-8")
+
+
+_iso_cache: Dict[Optional[tzinfo], Tuple[int, str]] = {}
+
+
+def iso_now(tz: Optional[tzinfo] = None) -> str:
+    """秒精度のISO時刻文字列（同じ秒の間は前回の文字列を返す）"""
+    sec = int(time.time())
+    cached = _iso_cache.get(tz)
+    if cached is not None and cached[0] == sec:
+        return cached[1]
+    text = datetime.fromtimestamp(sec, tz).isoformat(timespec="seconds")
+    _iso_cache[tz] = (sec, text)
+    return text
+
+
+class JsonStatCache:
+    """パス毎に ((inode, mtime_ns, ctime_ns, size), パース結果) を保持するJSONキャッシュ"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int, int, int], Any]] = {}
+
+    def get(self, path: str) -> Any:
+        """
+        JSONファイルを読み込む（変更が無ければ前回のパース結果を返す）
+
+        Raises:
+            FileNotFoundError: ファイルが無い場合
+            ValueError: JSONとして壊れている場合
+        """
+        st = os.stat(path)
+        # 書き手は tmp + os.replace なので差し替えのたびに inode が変わる
+        # （同じサイズ・同じ mtime の刻み内の差し替えでも取りこぼさない）
+        key = (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        with open(path, "rb") as f:
+            data = json_loads(f.read())
+        self._entries[path] = (key, data)
+        return data
+
+    def invalidate(self, path: str):
+        """キャッシュを破棄（自分で書き込んだ直後など）"""
+        self._entries.pop(path, None)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+システム状態サンプラ
+CPU温度 / CPU使用率 / メモリ / ディスク使用率を一括取得してTTLキャッシュする
+
+OLEDFanController と HealthMonitor が同じ値を短時間に何度も取りに行くため、
+1回のサンプリング結果をプロセス内で共有する。
+ネット疎通確認（TCP接続プローブ）と systemd ユニット状態取得もここに置いて両者から共用する。
+"""
+
+import os
+import time
+import socket
+import logging
+import subprocess
+from typing import Dict, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    from pystemd.systemd1 import Unit as SystemdUnit
+    PYSTEMD_AVAILABLE = True
+except ImportError:
+    PYSTEMD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class SystemSampler:
+    """CPU温度・負荷・メモリ・ディスクのまとめ取りサンプラ"""
+
+    THERMAL_PATH = "/sys/class/thermal/thermal_zone0/temp"
+    DEFAULT_TTL = 2.0
+
+    def __init__(self, disk_path: str = "/"):
+        self.disk_path = disk_path
+        self._cache: Dict[str, float] = {}
+        self._cache_ts = float("-inf")
+        self._thermal_fd: Optional[int] = None
+        self.last_temp_error: Optional[Exception] = None  # 直近の温度読み込み失敗（呼び出し側のログ用）
+
+    def read_cpu_temp(self) -> Optional[float]:
+        """sysfsの温度を読む（fdは開きっぱなしで pread で先頭から読み直す）"""
+        try:
+            if self._thermal_fd is None:
+                self._thermal_fd = os.open(self.THERMAL_PATH, os.O_RDONLY)
+            buf = os.pread(self._thermal_fd, 16, 0)
+            return int(buf.strip()) / 1000.0
+        except Exception as e:
+            logger.debug(f"CPU温度読み込み失敗: {e}")
+            self.last_temp_error = e
+            self.close()
+            return None
+
+    def sample(self, ttl: float = DEFAULT_TTL) -> Dict[str, float]:
+        """
+        システム状態を取得（ttl秒以内の再呼び出しはキャッシュを返す）
+
+        Returns:
+            cpu_temp / cpu_percent / mem_percent / disk_percent を持つdict
+            取得できなかった項目は含まれない
+        """
+        now = time.monotonic()
+        if now - self._cache_ts < ttl:
+            return self._cache
+
+        info: Dict[str, float] = {}
+        temp = self.read_cpu_temp()
+        if temp is not None:
+            info["cpu_temp"] = temp
+        if PSUTIL_AVAILABLE:
+            try:
+                info["cpu_percent"] = psutil.cpu_percent()
+                info["mem_percent"] = psutil.virtual_memory().percent
+                info["disk_percent"] = psutil.disk_usage(self.disk_path).percent
+            except Exception as e:
+                logger.debug(f"psutil取得失敗: {e}")
+
+        self._cache = info
+        self._cache_ts = now
+        return info
+
+    def close(self):
+        """温度ファイルのfdを閉じる"""
+        if self._thermal_fd is not None:
+            try:
+                os.close(self._thermal_fd)
+            except OSError:
+                pass
+            self._thermal_fd = None
+
+
+def check_network(host: str = "1.1.1.1", port: int = 53, timeout: float = 0.7) -> bool:
+    """DNSポートへのTCP接続でネット疎通を確認（ping を fork しない）"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except Exception:
+        return False
+
+
+# pystemd の Unit オブジェクトキャッシュ（D-Bus接続を使い回す）
+_units: Dict[str, "SystemdUnit"] = {}
+
+
+def get_service_state(service: str, timeout: float = 5) -> str:
+    """
+    systemdユニットの ActiveState を返す（"active" / "inactive" / "failed" 等）
+
+    pystemd があれば D-Bus のプロパティ読み出しのみ（fork無し）、
+    無ければ systemctl is-active にフォールバックする。
+    """
+    name = service if "." in service else f"{service}.service"
+    if PYSTEMD_AVAILABLE:
+        try:
+            unit = _units.get(name)
+            if unit is None:
+                unit = SystemdUnit(name.encode())
+                unit.load()
+                _units[name] = unit
+            state = unit.Unit.ActiveState
+            return state.decode() if isinstance(state, bytes) else str(state)
+        except Exception as e:
+            logger.debug(f"D-Bus経由のユニット状態取得失敗 ({name}): {e}")
+            _units.pop(name, None)
+
+    result = subprocess.run(
+        ["systemctl", "is-active", name],
+        capture_output=True, text=True, timeout=timeout
+    )
+    return result.stdout.strip()
+
+
+_sampler = SystemSampler()
+
+
+def get_sampler() -> SystemSampler:
+    """プロセス共有のサンプラを返す"""
+    return _sampler